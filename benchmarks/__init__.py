@@ -0,0 +1,4 @@
+"""Benchmarks for bftools.
+
+Run them from the root of the repository with ``python -m benchmarks``, see ``python -m benchmarks --help``.
+"""
@@ -0,0 +1,198 @@
+"""Measure the throughput and peak memory of compiling, decoding and encoding, and compare them with a baseline.
+
+Examples
+--------
+Store a baseline, make some changes, then compare against it::
+
+    python -m benchmarks --memory --output baseline.json
+    python -m benchmarks --memory --baseline baseline.json
+
+The exit code is ``1`` if any benchmark regressed by more than ``--threshold``.
+"""
+
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import bftools
+from bftools.base import ENGINES
+
+from .corpus import build_corpus
+
+Benchmark = Tuple[str, Callable[[], object], int]
+
+
+def benchmarks(
+    int_sizes: Sequence[bftools.IntegerSize],
+    array_sizes: Sequence[int],
+    engines: Sequence[bftools.Engine],
+    scale: int,
+) -> Iterator[Benchmark]:
+    """Get every benchmark, as ``(name, function, amount of input characters)`` tuples."""
+    for int_size in int_sizes:
+        corpus = build_corpus(int_size, scale)
+        for array_size in array_sizes:
+            tools = bftools.BrainfuckTools(array_size=array_size, int_size=int_size)
+            suffix = f"int{int_size}/array{array_size}"
+            for name, code in corpus.programs.items():
+                yield f"compile/{name}/{suffix}", partial(
+                    tools.compile, code, minify=False
+                ), len(code)
+                for engine in engines:
+                    yield f"decode-{engine}/{name}/{suffix}", partial(
+                        tools.decode, code, engine=engine, stdin=b""
+                    ), len(code)
+            for name, text in corpus.texts.items():
+                yield f"encode/{name}/{suffix}", partial(tools.encode, text), len(text)
+
+
+def measure(
+    function: Callable[[], object], size: int, repeat: int, memory: bool
+) -> Dict[str, float]:
+    """Run a benchmark, returning the fastest time, the throughput in characters per second and, if ``memory`` is
+    true, the peak memory in bytes."""
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+    result = {"seconds": seconds, "throughput": size / seconds if seconds else 0.0}
+    if memory:
+        # Tracing slows everything down, so the memory is measured in a separate run
+        tracemalloc.start()
+        try:
+            function()
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Get a description of every benchmark that is slower or uses more memory than its baseline."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for field in ("seconds", "peak_memory"):
+            if (
+                field in result
+                and old.get(field)
+                and result[field] > old[field] * (1 + threshold)
+            ):
+                regressions.append(
+                    f"{name}: {field} went from {old[field]:.6g} to {result[field]:.6g} "
+                    f"({result[field] / old[field] - 1:+.0%})"
+                )
+    return regressions
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="bftools benchmarks"
+    )
+    parser.add_argument(
+        "--int-sizes", type=int, nargs="+", default=[8, 16, 32, 64], metavar="BITS"
+    )
+    parser.add_argument(
+        "--array-sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 30000, 1000000],
+        metavar="CELLS",
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=ENGINES,
+        default=["compiler", "interpreter"],
+        help="the engines to decode with (default: compiler interpreter), native compiles every program with cc",
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="how large the inputs are (default: 1)"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="runs per benchmark (default: 3)"
+    )
+    parser.add_argument(
+        "--filter", default="", help="only run benchmarks whose name matches this"
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="also measure the peak memory, which is much slower for large generated code",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="the fraction a benchmark may be slower or larger before it regressed (default: 0.25)",
+    )
+    args = parser.parse_args(arguments)
+    pattern = re.compile(args.filter)
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'Benchmark':<52} {'Seconds':>10} {'Chars/s':>12} {'Peak KiB':>10}")
+    for name, function, size in benchmarks(
+        args.int_sizes, args.array_sizes, args.engines, args.scale
+    ):
+        if not pattern.search(name):
+            continue
+        result = measure(function, size, args.repeat, args.memory)
+        results[name] = result
+        peak = f"{result['peak_memory'] / 1024:.0f}" if args.memory else "-"
+        print(
+            f"{name:<52} {result['seconds']:>10.4f} {result['throughput']:>12.0f} {peak:>10}"
+        )
+
+    report: Dict[str, Any] = {
+        "bftools": bftools.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "scale": args.scale,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline.get("scale") != args.scale:
+        print(
+            f"The baseline was run with --scale {baseline.get('scale')}, so it can not be compared."
+        )
+        return 1
+    for key in ("python", "implementation", "machine"):
+        if baseline.get(key) != report[key]:
+            print(
+                f"Warning: the baseline was run on {key} {baseline.get(key)}, not {report[key]}."
+            )
+    regressions = compare(results, baseline["results"], args.threshold)
+    if not regressions:
+        print(f"No regressions compared to {args.baseline}.")
+        return 0
+    print(f"{len(regressions)} regressions compared to {args.baseline}:")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""The programs and texts the benchmarks run on."""
+
+import random
+import string
+from typing import Dict, NamedTuple
+
+import bftools
+
+__all__ = (
+    "Corpus",
+    "HELLO_WORLD",
+    "build_corpus",
+    "comment_heavy",
+    "nested_loops",
+)
+
+HELLO_WORLD = "++++++++[>++++[>++>+++>+++>+<<<<-]>+>+>->>+[<]<-]>>.>---.+++++++..+++.>>.<-.<.+++.------.--------.>>+.>++."
+
+_LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore "
+    "magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo "
+    "consequat.\n"
+)
+
+
+class Corpus(NamedTuple):
+    """The inputs for one integer size."""
+
+    programs: Dict[str, str]
+    """The brainfuck programs to compile and decode, by name."""
+    texts: Dict[str, str]
+    """The texts to encode, by name."""
+
+
+def nested_loops(depth: int, count: int) -> str:
+    """Make a program with ``depth`` nested loops that each run ``count`` times, around a multiply loop.
+
+    The optimizer replaces the innermost loop with multiplications, but not the loops around it.
+    """
+    code = ("+" * count + "[>") * depth
+    code += "+" * count + "[>+>++<<-]"
+    code += "<-]" * depth
+    return code + ">" * (depth + 1) + ".>."
+
+
+def comment_heavy(code: str, repeat: int) -> str:
+    """Make a program that runs ``code`` ``repeat`` times, with a comment after every instruction.
+
+    Every run starts 16 cells to the right of the previous one, so ``code`` must only use the first 16 cells.
+    """
+    comment = " this comment is ignored by the parser but it still has to be read "
+    return "".join(symbol + comment for symbol in code + ">" * 16) * repeat
+
+
+def build_corpus(int_size: bftools.IntegerSize, scale: int) -> Corpus:
+    """Build the inputs for an integer size.
+
+    Parameters
+    ----------
+    int_size: IntegerSize
+        The amount of bits per integer. Encoded texts are encoded with this size, since the code depends on it.
+    scale: int
+        How large the inputs are. The size of the texts and the runtime of the programs grow linearly with it.
+
+    Returns
+    -------
+    Corpus
+        The inputs.
+    """
+    generator = random.Random(0)
+    texts = {
+        "lorem": _LOREM * 100 * scale,
+        "random": "".join(
+            generator.choice(string.printable) for _ in range(20000 * scale)
+        ),
+    }
+    # Decoding is much slower than encoding, so the encoded texts are shorter
+    encoder = bftools.BrainfuckTools(int_size=int_size)
+    programs = {
+        "hello_world": HELLO_WORLD,
+        "encoded_lorem": str(encoder.encode(_LOREM * 5 * scale)),
+        "encoded_random": str(
+            encoder.encode(texts["random"][: 500 * scale], strategy="delta")
+        ),
+        "nested_loops": nested_loops(3, 20 * scale),
+        "comment_heavy": comment_heavy(HELLO_WORLD, 10 * scale),
+    }
+    return Corpus(programs, texts)
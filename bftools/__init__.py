@@ -10,12 +10,20 @@ A brainfuck toolbox for python.
 """
 
 from .base import *
+from .batch import *
+from .buffers import *
+from .cache import *
 from .compiler import *
 from .core import *
 from .decoder import *
 from .encoder import *
 from .enums import *
 from .exceptions import *
+from .interpreter import *
+from .ir import *
+from .native import *
+from .optimizer import *
+from .profiler import *
 from .tools import *
 
 __title__ = "bftools"
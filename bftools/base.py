@@ -5,18 +5,27 @@ from typing import Optional
 from .exceptions import NotParsedException
 
 if sys.version_info >= (3, 8):
-    from typing import Literal
+    from typing import Literal, get_args
 else:  # pragma: no cover
-    from typing_extensions import Literal
+    from typing_extensions import Literal, get_args
 
 
 __all__ = (
     "BrainfuckBase",
+    "EncodingStrategy",
+    "EndOfInput",
+    "Engine",
     "IntegerSize",
     "HasSizes",
 )
 
 IntegerSize = Literal[8, 16, 32, 64]
+Engine = Literal["compiler", "interpreter", "native"]
+ENGINES = get_args(Engine)
+EndOfInput = Literal["leave", "zero", "minus_one"]
+END_OF_INPUT = get_args(EndOfInput)
+EncodingStrategy = Literal["absolute", "delta", "bank"]
+ENCODING_STRATEGIES = get_args(EncodingStrategy)
 
 
 class BrainfuckBase(ABC):
@@ -0,0 +1,105 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+__all__ = ("BatchResult",)
+
+
+class BatchResult(NamedTuple):
+    """The result of one program from :meth:`BrainfuckTools.compile_many` or :meth:`BrainfuckTools.decode_many`."""
+
+    position: int
+    """The index of the program in the programs that were given."""
+    result: Optional[str]
+    """The generated code or the decoded text, or ``None`` if the program failed."""
+    error: Optional[Exception]
+    """The exception the program raised, or ``None`` if it succeeded."""
+
+
+def _compile_batch(
+    options: Dict[str, Any], start: int, codes: List[str]
+) -> List[BatchResult]:
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from .core import BrainfuckTools
+
+    tools = BrainfuckTools(options.pop("array_size"), options.pop("int_size"))
+    results = []
+    for index, code in enumerate(codes, start):
+        try:
+            results.append(
+                BatchResult(index, str(tools.compile(code, **options)), None)
+            )
+        except Exception as error:  # pylint: disable=broad-except
+            results.append(BatchResult(index, None, error))
+    return results
+
+
+def _decode_batch(
+    options: Dict[str, Any], start: int, codes: List[str]
+) -> List[BatchResult]:
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from .core import BrainfuckTools
+
+    tools = BrainfuckTools(options.pop("array_size"), options.pop("int_size"))
+    results = []
+    for index, code in enumerate(codes, start):
+        try:
+            results.append(
+                BatchResult(index, str(tools.decode(code, stdin=b"", **options)), None)
+            )
+        except Exception as error:  # pylint: disable=broad-except
+            results.append(BatchResult(index, None, error))
+    return results
+
+
+def run_batches(
+    executor: Executor,
+    function: Callable[[Dict[str, Any], int, List[str]], List[BatchResult]],
+    options: Dict[str, Any],
+    codes: Iterable[str],
+    chunksize: int,
+    max_pending: int,
+    ordered: bool,
+) -> Iterator[BatchResult]:
+    """Run ``function`` on chunks of ``codes`` in ``executor``, with at most ``max_pending`` chunks submitted at once
+    so the programs are only read from ``codes`` as they are needed."""
+    iterator = iter(codes)
+    pending: Deque["Future[List[BatchResult]]"] = deque()
+    start = 0
+
+    def submit() -> bool:
+        nonlocal start
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return False
+        pending.append(executor.submit(function, dict(options), start, chunk))
+        start += len(chunk)
+        return True
+
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < max_pending:
+            exhausted = not submit()
+        if not pending:
+            return
+        if ordered:
+            yield from pending.popleft().result()
+            continue
+        done: Set["Future[List[BatchResult]]"] = wait(
+            pending, return_when=FIRST_COMPLETED
+        )[0]
+        for future in done:
+            pending.remove(future)
+            yield from future.result()
@@ -0,0 +1,249 @@
+import codecs
+import sys
+from array import array
+from typing import (
+    IO,
+    Any,
+    Iterable,
+    Iterator,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .base import END_OF_INPUT, EndOfInput, IntegerSize
+
+__all__ = (
+    "InputBuffer",
+    "InputSource",
+    "OutputBuffer",
+)
+
+InputSource = Union[bytes, bytearray, str, IO[Any], Iterable[Union[bytes, str, int]]]
+
+
+def _typecode(int_size: IntegerSize) -> str:
+    """Get the unsigned array type code with items of exactly ``int_size`` bits on this platform."""
+    return next(code for code in "BHILQ" if array(code).itemsize * 8 == int_size)
+
+
+class OutputBuffer:
+    """A buffer that collects the raw values a program outputs.
+
+    Each output appends the value of the current cell to :attr:`buffer`, which is a single call to its ``append``
+    method. The values are only converted to text once the program has finished, by :meth:`text`.
+
+    Parameters
+    ----------
+    int_size: IntegerSize
+        The amount of bits per integer. This decides the type of the buffer that is created if ``buffer`` is not
+        given: a :class:`bytearray` for 8 bits, or an :class:`array.array` with items of ``int_size`` bits otherwise.
+    buffer: Optional[MutableSequence[int]]
+        The buffer to append the values to, such as a :class:`bytearray` you want to keep using after decoding. It
+        must be able to hold every value the program outputs, so a :class:`bytearray` can only be used for values
+        below 256.
+    encoding: Optional[str]
+        The encoding used by :meth:`text` to decode the values, which must then all be below 256. If ``None``, each
+        value is converted with :func:`chr`, as if it was a unicode code point.
+    errors: str
+        The error handling scheme used with ``encoding``, see :meth:`bytes.decode`.
+
+    Attributes
+    ----------
+    buffer: MutableSequence[int]
+        The values that have been output.
+    write: Callable[[int], None]
+        Appends a value to :attr:`buffer`. This is what the engines call for every output.
+    """
+
+    def __init__(
+        self,
+        int_size: IntegerSize = 8,
+        buffer: Optional[MutableSequence[int]] = None,
+        encoding: Optional[str] = None,
+        errors: str = "strict",
+    ) -> None:
+        if buffer is None:
+            buffer = bytearray() if int_size == 8 else array(_typecode(int_size))
+        self.buffer = buffer
+        self.write = buffer.append
+        self._encoding = encoding
+        self._errors = errors
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        if encoding is not None:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors)
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def getvalue(self) -> bytes:
+        """Get the values that have been output as bytes.
+
+        Returns
+        -------
+        bytes
+            The values.
+
+        Raises
+        ------
+        ValueError
+            If a value is 256 or larger.
+        """
+        if isinstance(self.buffer, (bytes, bytearray)):
+            return bytes(self.buffer)
+        return bytes(list(self.buffer))
+
+    def text(self) -> str:
+        """Convert the values that have been output into text.
+
+        Returns
+        -------
+        str
+            The text.
+
+        Raises
+        ------
+        ValueError
+            If a value can not be converted.
+        """
+        if self._encoding is not None:
+            return self.getvalue().decode(self._encoding, self._errors)
+        if isinstance(self.buffer, (bytes, bytearray)):
+            # Every byte is the code point of the same value in latin-1, and this is much faster than chr()
+            return self.buffer.decode("latin-1")
+        return "".join(map(chr, self.buffer))
+
+    def drain(self, final: bool = False) -> str:
+        """Convert the values in the buffer into text like :meth:`text`, then remove them from the buffer.
+
+        This is used to stream the output while the program runs. With an ``encoding``, bytes that end in the middle
+        of a character are kept until the rest of the character has been output.
+
+        Parameters
+        ----------
+        final: bool
+            Whether the program has finished, so no more values will be output.
+
+        Returns
+        -------
+        str
+            The text.
+
+        Raises
+        ------
+        ValueError
+            If a value can not be converted.
+        """
+        if self._decoder is not None:
+            text = self._decoder.decode(self.getvalue(), final)
+        else:
+            text = self.text()
+        del self.buffer[:]
+        return text
+
+
+class InputBuffer:
+    """A buffer that provides the values a program reads as input.
+
+    The input is read ahead in chunks, so a program that reads a lot of input does not need a call to the source for
+    every value.
+
+    Parameters
+    ----------
+    source: Optional[InputSource]
+        Where to read the input from:
+
+        - :class:`bytes` or :class:`bytearray`, where each byte is one value.
+        - :class:`str`, where each character is one value, its code point.
+        - A file object opened in binary or text mode, which is read ``chunk_size`` bytes or characters at a time.
+        - An iterable of :class:`bytes`, :class:`str` or :class:`int` chunks, which is consumed lazily.
+        - ``None``, to read from :data:`sys.stdin` one character at a time, so interactive programs get their input
+          as soon as it is typed.
+    eof: EndOfInput
+        What an input does to the current cell once there is no more input: ``"leave"`` keeps its value, ``"zero"``
+        sets it to ``0`` and ``"minus_one"`` sets it to ``-1``, which is the largest value of the cell.
+    chunk_size: int
+        The amount of bytes or characters to read from a file object at once.
+
+    Raises
+    ------
+    ValueError
+        If ``eof`` is not a valid :data:`EndOfInput`.
+    """
+
+    def __init__(
+        self,
+        source: Optional[InputSource] = None,
+        eof: EndOfInput = "leave",
+        chunk_size: int = 65536,
+    ) -> None:
+        if eof not in END_OF_INPUT:
+            raise ValueError(
+                f"Unknown end of input behaviour {eof!r}, expected one of {', '.join(map(repr, END_OF_INPUT))}."
+            )
+        self._eof = eof
+        self._chunk_size = chunk_size
+        self._file: Optional[IO[Any]] = None
+        self._chunks: Optional[Iterator[Union[bytes, str, int]]] = None
+        self._values: Sequence[int] = b""
+        self._index = 0
+        if source is None:
+            pass
+        elif isinstance(source, (bytes, bytearray)):
+            self._values = source
+        elif isinstance(source, str):
+            self._values = array("L", map(ord, source))
+        elif hasattr(source, "read"):
+            self._file = source  # type: ignore[assignment]
+        else:
+            self._chunks = iter(source)
+        self._stdin = source is None
+
+    def _fill(self) -> bool:
+        """Read the next chunk of input into the buffer, returning whether there was any."""
+        data: Union[bytes, str, int]
+        if self._stdin:
+            data = sys.stdin.read(1)
+        elif self._file is not None:
+            data = self._file.read(self._chunk_size)
+        elif self._chunks is not None:
+            # Empty chunks do not mean that the input has ended
+            for data in self._chunks:
+                if data not in (b"", ""):
+                    break
+            else:
+                self._chunks = None
+                return False
+        else:
+            return False
+        if isinstance(data, int):
+            self._values = (data,)
+        elif isinstance(data, str):
+            self._values = array("L", map(ord, data))
+        else:
+            self._values = data
+        self._index = 0
+        return bool(self._values)
+
+    def read(self, value: int) -> int:
+        """Read the next value of the input. This is what the engines call for every input.
+
+        Parameters
+        ----------
+        value: int
+            The value of the current cell, which is returned if there is no more input and ``eof`` is ``"leave"``.
+
+        Returns
+        -------
+        int
+            The value to store in the current cell. This is not masked to the size of the cell.
+        """
+        if self._index >= len(self._values) and not self._fill():
+            if self._eof == "zero":
+                return 0
+            if self._eof == "minus_one":
+                return -1
+            return value
+        self._index += 1
+        return self._values[self._index - 1]
@@ -0,0 +1,406 @@
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from types import CodeType
+from typing import List, NamedTuple, Optional, Union
+
+from .base import IntegerSize
+
+__all__ = (
+    "CacheInfo",
+    "CompileCache",
+    "DiskCache",
+)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics about a :class:`CompileCache`, returned by :meth:`BrainfuckTools.cache_info`."""
+
+    hits: int
+    """The amount of lookups that found an entry."""
+    misses: int
+    """The amount of lookups that did not find an entry."""
+    entries: int
+    """The amount of entries in the cache."""
+    max_entries: int
+    """The maximum amount of entries in the cache."""
+    size: int
+    """The size of the generated code in the cache, in bytes when encoded as UTF-8."""
+    max_size: Optional[int]
+    """The maximum size of the generated code in the cache, in bytes. If ``None``, the size is not limited."""
+
+
+class CacheEntry:
+    """A compiled program stored in a :class:`CompileCache`.
+
+    Attributes
+    ----------
+    result: str
+        The full generated code, see :attr:`CompiledBrainfuck.result`.
+    body: str
+        The generated code without the runtime, see :attr:`CompiledBrainfuck.body`.
+    code: Optional[CodeType]
+        :attr:`body` compiled into a code object. This is ``None`` until the program has been decoded once.
+    """
+
+    __slots__ = ("result", "body", "code")
+
+    def __init__(self, result: str, body: str, code: Optional[CodeType] = None) -> None:
+        self.result = result
+        self.body = body
+        self.code = code
+
+    @property
+    def size(self) -> int:
+        """The size of the generated code, in bytes when encoded as UTF-8."""
+        return len(self.result.encode("utf-8")) + len(self.body.encode("utf-8"))
+
+
+class CompileCache:
+    """A least recently used cache of compiled programs.
+
+    .. note::
+        This is meant to be used internally and you should not need to use it. Pass ``cache_size`` to
+        :class:`BrainfuckTools` instead.
+
+    Parameters
+    ----------
+    max_entries: int
+        The maximum amount of entries. If this is ``0``, the cache is disabled.
+    max_size: Optional[int]
+        The maximum size of the generated code in the cache, in bytes. If ``None``, the size is not limited.
+    """
+
+    def __init__(self, max_entries: int, max_size: Optional[int] = None) -> None:
+        self._max_entries = max_entries
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self._max_entries > 0
+
+    @staticmethod
+    def make_key(
+        code: str,
+        array_size: int,
+        int_size: IntegerSize,
+        minify: Optional[bool],
+        optimize: bool,
+        fast: bool = False,
+        interruptible: bool = False,
+    ) -> str:
+        """Make the key of a program.
+
+        Parameters
+        ----------
+        code: str
+            The brainfuck code.
+        array_size: int
+            The size of the array.
+        int_size: IntegerSize
+            The amount of bits per integer.
+        minify: Optional[bool]
+            Whether the code is minified.
+        optimize: bool
+            Whether the code is optimized.
+        fast: bool
+            Whether the code is generated in fast mode.
+        interruptible: bool
+            Whether the code can be paused while it runs.
+
+        Returns
+        -------
+        str
+            The key.
+        """
+        digest = hashlib.sha256(code.encode("utf-8", "surrogatepass"))
+        digest.update(
+            f"\0{array_size}\0{int_size}\0{minify}\0{optimize}\0{fast}\0{interruptible}".encode()
+        )
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry, marking it as recently used.
+
+        Parameters
+        ----------
+        key: str
+            The key from :meth:`make_key`.
+
+        Returns
+        -------
+        Optional[CacheEntry]
+            The entry, or ``None`` if it is not in the cache.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Add an entry, evicting the least recently used entries until the cache fits in its limits.
+
+        Entries that are larger than the maximum size on their own are not stored.
+
+        Parameters
+        ----------
+        key: str
+            The key from :meth:`make_key`.
+        entry: CacheEntry
+            The entry to add.
+        """
+        if not self.enabled or (
+            self._max_size is not None and entry.size > self._max_size
+        ):
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old.size
+        self._entries[key] = entry
+        self._size += entry.size
+        while len(self._entries) > self._max_entries or (
+            self._max_size is not None and self._size > self._max_size
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    def info(self) -> CacheInfo:
+        """Get statistics about the cache.
+
+        Returns
+        -------
+        CacheInfo
+            The statistics.
+        """
+        return CacheInfo(
+            hits=self._hits,
+            misses=self._misses,
+            entries=len(self._entries),
+            max_entries=self._max_entries,
+            size=self._size,
+            max_size=self._max_size,
+        )
+
+    def clear(self) -> None:
+        """Remove every entry and reset the statistics."""
+        self._entries.clear()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+
+class DiskCache:
+    """A cache of compiled programs stored in a directory, so they survive process restarts.
+
+    Each program is stored in its own file, containing the generated code and its code object serialized with
+    :mod:`marshal`. The file name is derived from the key of the program, the bftools version and the python bytecode
+    version, so files written by other versions are never loaded. Files are written atomically, and the least recently
+    used files are removed when the directory grows larger than its maximum size. The total size is kept in memory
+    after the directory has been scanned once, so it is only scanned again when the maximum size is exceeded.
+    Temporary files left behind by writes that were interrupted are removed once they are an hour old. The shared
+    libraries of the native engine are stored in :attr:`library_directory`, and are pruned and cleared along with the
+    programs.
+
+    .. note::
+        This is meant to be used internally and you should not need to use it. Pass ``cache_dir`` to
+        :class:`BrainfuckTools` or use :func:`set_default_cache_dir` instead.
+
+    Parameters
+    ----------
+    directory: Union[str, os.PathLike]
+        The directory to store programs in. It is created if it does not exist.
+    max_size: Optional[int]
+        The maximum total size of the files in the directory, in bytes. If ``None``, the size is not limited.
+    """
+
+    SUFFIX = ".bfc"
+    #: The age in seconds after which a temporary file is assumed to be left behind by an interrupted write.
+    STALE_AFTER = 3600
+    #: The suffixes of the shared libraries in :attr:`library_directory`.
+    LIBRARY_SUFFIXES = (".so", ".dll")
+    #: Changed whenever the generated code changes in a way that makes stored programs unusable.
+    FORMAT = 3
+
+    def __init__(
+        self, directory: Union[str, "os.PathLike[str]"], max_size: Optional[int] = None
+    ) -> None:
+        self._directory = os.fspath(directory)
+        self._max_size = max_size
+        # The total size of the files, or None if the directory has not been scanned yet
+        self._size: Optional[int] = None
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        """The directory programs are stored in."""
+        return self._directory
+
+    @property
+    def library_directory(self) -> str:
+        """The directory the native engine stores its shared libraries in, see :class:`NativeBrainfuck`."""
+        return os.path.join(self._directory, "native")
+
+    def _path(self, key: str) -> str:
+        from . import __version__  # pylint: disable=import-outside-toplevel
+
+        digest = hashlib.sha256(key.encode())
+        digest.update(f"{__version__}\0{self.FORMAT}".encode())
+        digest.update(importlib.util.MAGIC_NUMBER)
+        name = f"{digest.hexdigest()}.{sys.implementation.cache_tag}{self.SUFFIX}"
+        return os.path.join(self._directory, name)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Load a program.
+
+        Parameters
+        ----------
+        key: str
+            The key from :meth:`CompileCache.make_key`.
+
+        Returns
+        -------
+        Optional[CacheEntry]
+            The program, or ``None`` if it is not stored or its file can not be loaded.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                result, body, code = marshal.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError):
+            # The file is corrupt, remove it so it gets written again
+            self._remove(path)
+            return None
+        # Mark the file as recently used for pruning
+        try:
+            os.utime(path)
+        except OSError:  # pragma: no cover
+            pass
+        return CacheEntry(result, body, code)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Store a program, then remove the least recently used files if the directory is too large.
+
+        Parameters
+        ----------
+        key: str
+            The key from :meth:`CompileCache.make_key`.
+        entry: CacheEntry
+            The program to store. Its :attr:`CacheEntry.code` must not be ``None``.
+        """
+        data = marshal.dumps((entry.result, entry.body, entry.code))
+        descriptor, temporary = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            self._remove(temporary)
+            raise
+        self.track(len(data))
+
+    def track(self, size: int) -> None:
+        """Count a file that was added to the directory, then remove the least recently used files if the directory
+        is too large.
+
+        Parameters
+        ----------
+        size: int
+            The size of the file, in bytes.
+        """
+        if self._max_size is None:
+            return
+        if self._size is None:
+            self.prune()
+            return
+        # Replacing a file may count it twice, which at worst prunes a bit earlier than needed
+        self._size += size
+        if self._size > self._max_size:
+            self.prune()
+
+    def _files(self) -> "List[os.DirEntry[str]]":
+        stale = time.time() - self.STALE_AFTER
+        files = []
+        with os.scandir(self._directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.endswith(self.SUFFIX) or (
+                        entry.name.endswith(".tmp") and entry.stat().st_mtime < stale
+                    ):
+                        files.append(entry)
+                except OSError:  # pragma: no cover
+                    continue
+        try:
+            with os.scandir(self.library_directory) as entries:
+                files.extend(
+                    entry
+                    for entry in entries
+                    if entry.name.endswith(self.LIBRARY_SUFFIXES)
+                )
+        except FileNotFoundError:
+            pass
+        return files
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def size(self) -> int:
+        """Get the total size of the stored programs and libraries.
+
+        Returns
+        -------
+        int
+            The size, in bytes.
+        """
+        return sum(entry.stat().st_size for entry in self._files())
+
+    def prune(self, max_size: Optional[int] = None) -> None:
+        """Remove the least recently used files until the directory is no larger than the maximum size.
+
+        Parameters
+        ----------
+        max_size: Optional[int]
+            The size to prune to, in bytes. If ``None``, the maximum size of the cache is used.
+        """
+        if max_size is None:
+            max_size = self._max_size
+        if max_size is None:
+            return
+        files = []
+        for entry in self._files():
+            try:
+                stat = entry.stat()
+            except OSError:  # pragma: no cover
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= max_size:
+                break
+            self._remove(path)
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        """Remove every stored program and library."""
+        self.prune(0)
@@ -1,9 +1,14 @@
+import functools
+import importlib.resources
 import inspect
-import os
-from typing import List, Optional, Tuple
+import sys
+from types import CodeType
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from .base import BrainfuckBase, HasSizes, IntegerSize
-from .enums import Code, Symbol
+from .enums import Code, OpCode, Symbol
+from .ir import Program, parse_program, parse_stream, tokenize
+from .optimizer import optimize_program, optimize_stream
 
 __all__ = ("CompiledBrainfuck",)
 
@@ -13,14 +18,224 @@ except ImportError:
     pass
 
 
-def _handle_indentation(symbol: Symbol, indentation: int) -> int:
-    if symbol == Symbol.STARTLOOP:
+@functools.lru_cache(maxsize=None)
+def _read_template() -> str:
+    if sys.version_info >= (3, 9):
+        return (
+            importlib.resources.files(__package__)
+            .joinpath("template.py")
+            .read_text(encoding="utf-8")
+        )
+    return importlib.resources.read_text(  # pragma: no cover
+        __package__, "template.py", encoding="utf-8"
+    )
+
+
+def _text_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """Check that every chunk of a source is text, since a binary file would never return ``""`` at its end."""
+    for chunk in chunks:
+        if not isinstance(chunk, str):
+            raise TypeError(
+                f"Expected the code as str chunks, got {type(chunk).__name__}. Open files in text mode."
+            )
+        yield chunk
+
+
+@functools.lru_cache(maxsize=32)
+def _template_source(array_size: int, int_size: IntegerSize) -> str:
+    return _read_template().format(array_size, int_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _template_code(array_size: int, int_size: IntegerSize) -> CodeType:
+    return compile(_template_source(array_size, int_size), "<bftools runtime>", "exec")
+
+
+def _handle_indentation(op: int, indentation: int) -> int:
+    if op == OpCode.OPEN:
         indentation += 1
-    elif symbol == Symbol.ENDLOOP:
+    elif op == OpCode.CLOSE:
         indentation -= 1
     return indentation
 
 
+def _to_code(op: int, arg: int, offset: int) -> Optional[str]:
+    if op == OpCode.ADD:
+        if arg == 0:
+            return None
+        return str((Code.ADD if arg > 0 else Code.SUBTRACT).value).format(abs(arg))
+    if op == OpCode.MOVE:
+        if arg == 0:
+            return None
+        return str((Code.SHIFTRIGHT if arg > 0 else Code.SHIFTLEFT).value).format(
+            abs(arg)
+        )
+    return _CODES[op].format(arg, offset)
+
+
+_CODES: Dict[int, str] = {
+    OpCode.OPEN: Code.STARTLOOP.value,
+    OpCode.CLOSE: Code.ENDLOOP.value,
+    OpCode.INPUT: Code.INPUT.value,
+    OpCode.OUTPUT: Code.OUTPUT.value,
+    OpCode.SET: Code.SET.value,
+    OpCode.SCAN: Code.SCAN.value,
+    OpCode.MULTIPLY: Code.MULTIPLY.value,
+}
+
+
+_SYMBOLS = tuple(Symbol)
+
+_HEADER = "# Compiled using bftools (https://github.com/BobDotCom/bftools)\n"
+
+_FAST_HEADER = """def main(output, chunk_size, read{1}):
+    data = [0] * {0}
+    position = 0
+    write = output.append"""
+
+_FAST_END = """
+    yield{0}
+"""
+
+# Pauses interruptible code, which yields the amount of loop iterations it has left and can be given a new amount
+_PAUSE = "\n    sent = yield ticks\n    if sent is not None: ticks = sent"
+_INTERRUPTIBLE_OUTPUT = "write(data[position])\nif len(output) >= chunk_size:" + _PAUSE
+# Loop iterations are counted at the end of the loop, which is much cheaper than counting every instruction
+_INTERRUPTIBLE_CLOSE = "ticks -= 1\nif not ticks:" + _PAUSE
+# Every step of a scan replaces an iteration of a loop, so it is counted like one
+_INTERRUPTIBLE_SCAN = (
+    "while data[position]:\n    position = (position {0}) % {1}\n    ticks -= 1\n    if not ticks:"
+    + _PAUSE.replace("\n", "\n    ")
+)
+
+_FAST_FOOTER = """
+
+import sys
+
+
+def read(value):
+    character = sys.stdin.read(1)
+    return ord(character) if character else value
+
+
+output = []
+for _ in main(output, 1, read):
+    print("".join(map(chr, output)), end="")
+    output.clear()
+"""
+
+
+def _to_fast_code(
+    op: int, arg: int, offset: int, array_size: int, mask: int
+) -> Optional[str]:
+    # pylint: disable=too-many-return-statements
+    if op == OpCode.ADD:
+        if arg == 0:
+            return None
+        sign = "+" if arg > 0 else "-"
+        return f"data[position] = (data[position] {sign} {abs(arg)}) & {mask}"
+    if op == OpCode.MOVE:
+        if arg == 0:
+            return None
+        sign = "+" if arg > 0 else "-"
+        return f"position = (position {sign} {abs(arg)}) % {array_size}"
+    if op == OpCode.OPEN:
+        return "while data[position]:"
+    if op == OpCode.CLOSE:
+        return ""
+    if op == OpCode.OUTPUT:
+        return "write(data[position])\nif len(output) >= chunk_size: yield"
+    if op == OpCode.INPUT:
+        return f"data[position] = read(data[position]) & {mask}"
+    if op == OpCode.SET:
+        return f"data[position] = {arg & mask}"
+    if op == OpCode.SCAN:
+        sign = "+" if arg > 0 else "-"
+        return f"while data[position]: position = (position {sign} {abs(arg)}) % {array_size}"
+    # OpCode.MULTIPLY
+    return (
+        f"target = (position + {offset}) % {array_size}; "
+        f"data[target] = (data[target] + data[position] * {arg & mask}) & {mask}"
+    )
+
+
+def _add_comment(
+    lines: List[str], text: str, indentation: int, is_comment: bool
+) -> bool:
+    """Add a comment to the output, returning whether the last line of the output is now a comment."""
+    for value in text:
+        if is_comment:
+            # Continue the comment on the same line, unless this is the end of the line.
+            lines.append(value)
+            if value == "\n":
+                is_comment = False
+        elif value == "\n":
+            lines.append(f"\n{' ' * 4 * indentation}\n")
+        else:
+            lines.append(f"\n{' ' * 4 * indentation}# {value}")
+            is_comment = True
+    return is_comment
+
+
+class _CodeWriter:
+    """Generates python code one instruction at a time, appending it to :attr:`lines`."""
+
+    def __init__(
+        self,
+        array_size: int,
+        int_size: IntegerSize,
+        fast: bool,
+        interruptible: bool = False,
+    ) -> None:
+        self.lines: List[str] = []
+        if fast:
+            self.lines.append(
+                _FAST_HEADER.format(array_size, ", ticks" if interruptible else "")
+            )
+        self._array_size = array_size
+        self._mask = 2**int_size - 1
+        self._fast = fast
+        self._interruptible = fast and interruptible
+        self._indentation = 1 if fast else 0
+        # Whether the last line of the output is a comment, so more comment text can be added to the end of it.
+        self._is_comment = False
+        self._empty_loop = False
+
+    def instruction(self, op: int, arg: int, offset: int) -> None:
+        if self._fast:
+            line = _to_fast_code(op, arg, offset, self._array_size, self._mask)
+        else:
+            line = _to_code(op, arg, offset)
+        if line is None:
+            return
+        if self._interruptible:
+            if op == OpCode.OUTPUT:
+                line = _INTERRUPTIBLE_OUTPUT
+            elif op == OpCode.CLOSE:
+                line = _INTERRUPTIBLE_CLOSE
+            elif op == OpCode.SCAN:
+                line = _INTERRUPTIBLE_SCAN.format(
+                    f"{'+' if arg > 0 else '-'} {abs(arg)}", self._array_size
+                )
+        if op == OpCode.CLOSE and self._empty_loop and not line:
+            # Python does not allow empty blocks
+            line = "pass"
+        self._empty_loop = op == OpCode.OPEN
+        self._is_comment = False
+        for statement in line.split("\n"):
+            self.lines.append(f"\n{' ' * 4 * self._indentation}{statement}")
+        self._indentation = _handle_indentation(op, self._indentation)
+
+    def comment(self, text: str) -> None:
+        self._is_comment = _add_comment(
+            self.lines, text, self._indentation, self._is_comment
+        )
+
+    def end(self) -> None:
+        if self._fast:
+            self.lines.append(_FAST_END.format(" ticks" if self._interruptible else ""))
+
+
 class CompiledBrainfuck(BrainfuckBase, HasSizes):
     """An object to represent python compiled from Brainfuck.
 
@@ -44,6 +259,72 @@ class CompiledBrainfuck(BrainfuckBase, HasSizes):
         HasSizes.__init__(self, array_size=array_size, int_size=int_size)
         self._raw_parsed: Optional[List[Symbol]] = []
         self._comments = ""
+        self._source: Optional[str] = None
+        self._program: Optional[Program] = None
+        self._body: Optional[str] = None
+        self._fast = False
+
+    @property
+    def body(self) -> Optional[str]:
+        """
+        The part of :attr:`result` that was generated from the code, without the runtime it depends on.
+
+        This will never be ``None`` unless :meth:`parse` has not been called. Since the library
+        always calls :meth:`parse` before returning the object, this should never happen unless you override the
+        functionality of the library. This is never minified.
+
+        .. note::
+            This is meant to be used internally and you should not need to use it. Use :meth:`create_namespace` to
+            get the runtime to run it in.
+
+        Returns
+        -------
+        Optional[str]
+            The generated code.
+        """
+        return self._body
+
+    def create_namespace(self) -> Dict[str, Any]:
+        """Create a namespace containing a fresh runtime for :attr:`body` to run in.
+
+        The runtime is only read and compiled once per process for each array size and integer size, so this is much
+        cheaper than running the whole of :attr:`result`. Code generated with ``fast=True`` does not need a runtime, so
+        the namespace is empty.
+
+        .. note::
+            This is meant to be used internally and you should not need to use it.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The namespace, to be passed to :meth:`DecodedBrainfuck.parse`.
+        """
+        namespace: Dict[str, Any] = {}
+        if self._fast:
+            return namespace
+        exec(  # pylint: disable=exec-used  # nosec B102
+            _template_code(self.array_size, self.int_size), namespace
+        )
+        return namespace
+
+    @property
+    def program(self) -> Optional[Program]:
+        """
+        The intermediate representation of the code.
+
+        This will never be ``None`` unless :meth:`parse` has not been called. Since the library
+        always calls :meth:`parse` before returning the object, this should never happen unless you override the
+        functionality of the library.
+
+        .. note::
+            This is meant to be used internally and you should not need to use it.
+
+        Returns
+        -------
+        Optional[Program]
+            The parsed program.
+        """
+        return self._program
 
     @property
     def raw_parsed(self) -> Optional[Tuple[Symbol, ...]]:
@@ -64,20 +345,24 @@ class CompiledBrainfuck(BrainfuckBase, HasSizes):
         """
         if self._raw_parsed is None:
             return None
+        if not self._raw_parsed and self._source is not None:
+            # This is only built on demand, since the compiler itself works on the program instead, and programs
+            # from the cache are not parsed at all.
+            self._parse_raw(self._source)
         return tuple(self._raw_parsed)
 
     def _parse_raw(self, value: str) -> None:
-        self._raw_parsed = []
-        for character in value:
-            parsed = Symbol(character)
-            self._raw_parsed.append(parsed)
-            if parsed == Symbol.UNKNOWN:
-                self._comments += character
+        symbols, comments = tokenize(value)
+        self._raw_parsed = list(map(_SYMBOLS.__getitem__, symbols))
+        self._comments = "".join(value[start:end] for start, end in comments)
 
     def parse(
         self,
         value: str,
         minify: Optional[bool] = None,
+        optimize: bool = True,
+        fast: bool = False,
+        interruptible: bool = False,
     ) -> None:
         """Parse the given code.
 
@@ -93,71 +378,123 @@ class CompiledBrainfuck(BrainfuckBase, HasSizes):
         minify: Optional[bool]
             Whether to minify the code. If ``None``, this will be determined by whether :mod:`python_minifier` is
             installed.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program`.
+        fast: bool
+            Whether to generate a single function that keeps the array, the position and the output in local
+            variables and runs every instruction inline, instead of calling the helper functions of the runtime. This
+            is much faster to run, but harder to read. The generated code does not depend on a runtime. :attr:`body`
+            only defines the generator function ``main(output, chunk_size, read)``, which appends the value of every
+            output to ``output`` and yields whenever it holds at least ``chunk_size`` values, and once more when the
+            program ends. Each input calls ``read`` with the value of the current cell, like :meth:`InputBuffer.read`.
+            :attr:`result` also runs it, reading the input from :data:`sys.stdin` and printing the output.
+        interruptible: bool
+            Whether the code generated with ``fast=True`` can be paused while it runs. ``main`` then takes a fourth
+            argument, ``ticks``, which is the amount of loop iterations to run before pausing, counting every step of
+            a scan as an iteration. Every time ``main``
+            yields, it yields the amount of loop iterations it has left, and it can be resumed with
+            :meth:`generator.send` and a new amount, or ``None`` to keep the current amount. This makes the code a bit
+            slower, so it is only used to decode with limits. This is ignored if ``fast`` is ``False``.
         """
-        self._parse_raw(value)
+        self._fast = fast
+        self._source = value
+        self._program = parse_program(value)
+        if optimize:
+            self._program = optimize_program(self._program, self.int_size)
         # TODO: Add correct IntegerSize typehints in compiled code
+        writer = _CodeWriter(self.array_size, self.int_size, fast, interruptible)
+        program = self._program
+        comment = 0
+        for index, (op, arg, offset) in enumerate(
+            zip(program.ops, program.args, program.offsets)
+        ):
+            while (
+                comment < len(program.comments)
+                and program.comments[comment][0] == index
+            ):
+                writer.comment(program.comment(comment))
+                comment += 1
+            writer.instruction(op, arg, offset)
+        for comment in range(comment, len(program.comments)):
+            writer.comment(program.comment(comment))
+        writer.end()
+        self._body = "".join(writer.lines)
+        if fast:
+            self.result = self._body + _FAST_FOOTER
+        else:
+            self.result = _template_source(self.array_size, self.int_size) + self._body
+        self._minify(minify)
+        self.result = _HEADER + (self.result or "")
 
-        with open(
-            os.path.join(os.path.dirname(__file__), "template.py"), encoding="utf-8"
-        ) as file:
-            self.result = file.read().format(self.array_size, self.int_size)
-        #             self.result += f"""
-        # main = Main(array_size={self.array_size}, int_size={self.int_size})
-        # """
-        indentation = 0
-        stackable = (Symbol.SHIFTLEFT, Symbol.SHIFTRIGHT, Symbol.ADD, Symbol.SUBTRACT)
-        stack_level = 0
-        stack_type = None
-        is_comment = False
-        comments = iter(self._comments)
-        for symbol in self.raw_parsed or []:
-            if symbol in stackable and stack_type == symbol:
-                stack_level += 1
-                stack_type = symbol
-                continue
-            if symbol.name == "UNKNOWN":
-                value = next(comments)
-                if not is_comment:
-                    # New comment. Unless it's a newline, we want to add a pound sign.
-                    if value != "\n":
-                        value = f"# {value}"
-                    is_comment = True
-            else:
-                is_comment = False
-                value = Code[symbol.name].value
-
-            if stack_level > 0:
-                new_value = Code[stack_type.name].value.format(stack_level)  # type: ignore[union-attr]
-                stack_level = 0
-                self.result += f"\n{' ' * 4 * indentation}{new_value}"
-
-            if symbol in stackable:
-                stack_level += 1
-                stack_type = symbol
-                continue
-
-            try:
-                # We're checking if there has been a newline since the last comment. The pound index needs to be
-                # executed first, in case the first comment is on the first line. It's currently impossible for that
-                # to happen, but it's good to be safe.
-                pound_index = str.rindex(self.result, "#")
-                is_continued_comment = is_comment
-                if str.rindex(self.result, "\n") > pound_index:
-                    is_continued_comment = False
-            except ValueError:
-                is_continued_comment = False
-            if not is_continued_comment:
-                value = f"\n{' ' * 4 * indentation}{value}"
-            if value == "\n":
-                is_comment = False
-            self.result += value
+    def parse_stream(
+        self,
+        source: Union[IO[str], Iterable[str]],
+        destination: IO[str],
+        optimize: bool = True,
+        fast: bool = False,
+        chunk_size: int = 65536,
+    ) -> None:
+        """Parse the given code one chunk at a time, writing the generated code to ``destination`` as it goes.
 
-            indentation = _handle_indentation(symbol, indentation)
-        self._minify(minify)
-        self.result = (
-            "# Compiled using bftools (https://github.com/BobDotCom/bftools)\n"
-            + (self.result or "")
-        )
+        This generates the same code as :meth:`parse` with ``minify=False``, but only holds one chunk of the code, the
+        brackets that are still open and the innermost loop in memory, so it can compile code that is much larger than
+        the available memory. :attr:`result`, :attr:`body`, :attr:`program` and :attr:`raw_parsed` are not set, and the generated
+        code is never minified.
+
+        .. note::
+            You should not need to use this method. It is intended for internal use only, so you should only need to use
+            it if you override the functionality of the library. Use :meth:`BrainfuckTools.compile_stream` instead.
+
+        Parameters
+        ----------
+        source: Union[IO[str], Iterable[str]]
+            The code to parse, as a file object opened in text mode or an iterable of chunks.
+        destination: IO[str]
+            The file object opened in text mode to write the generated code to.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_stream`.
+        fast: bool
+            Whether to generate a single function that runs every instruction inline, see :meth:`parse`.
+        chunk_size: int
+            The amount of characters to read from ``source`` at once, if it is a file object.
+
+        Raises
+        ------
+        UnbalancedBracketsException
+            If the brackets in the code do not match up. The code before the bracket has already been written to
+            ``destination``.
+        TypeError
+            If ``source`` is a file object opened in binary mode, or a chunk is not a :class:`str`.
+        """
+        self._fast = fast
+        self._source = None
+        self._program = None
+        self._raw_parsed = None
+        self._body = None
+        self.result = None
+        if hasattr(source, "read"):
+            read = source.read
+            source = iter(lambda: read(chunk_size), "")
+        items = parse_stream(_text_chunks(source))
+        if optimize:
+            items = optimize_stream(items, int_size=self.int_size)
+        destination.write(_HEADER)
+        if not fast:
+            destination.write(_template_source(self.array_size, self.int_size))
+        writer = _CodeWriter(self.array_size, self.int_size, fast)
+        lines = writer.lines
+        for item in items:
+            if isinstance(item, str):
+                writer.comment(item)
+            else:
+                writer.instruction(*item)
+            if len(lines) >= 4096:
+                destination.write("".join(lines))
+                lines.clear()
+        writer.end()
+        if fast:
+            lines.append(_FAST_FOOTER)
+        destination.write("".join(lines))
 
     def _minify(self, should_minify: Optional[bool] = True) -> None:
         try:
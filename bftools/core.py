@@ -1,21 +1,101 @@
+import asyncio
+import functools
+import os
+import sys
+import time
 import warnings
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from types import TracebackType
+from typing import IO, Any, Generator, Iterable, Iterator, Optional, Type, Union
 
-from .base import IntegerSize
+from .base import ENGINES, EncodingStrategy, EndOfInput, Engine, IntegerSize
+from .batch import BatchResult, _compile_batch, _decode_batch, run_batches
+from .buffers import InputBuffer, InputSource, OutputBuffer
+from .cache import CacheEntry, CacheInfo, CompileCache, DiskCache
 from .compiler import CompiledBrainfuck
 from .decoder import DecodedBrainfuck
 from .encoder import EncodedBrainfuck
+from .exceptions import BudgetExceededException
+from .interpreter import BrainfuckInterpreter
+from .ir import parse_program
+from .native import NativeBrainfuck
+from .optimizer import optimize_program
+from .profiler import Profile
 
 __all__ = (
     "BrainfuckTools",
     "compile_bf",
+    "compile_bf_stream",
     "decode_bf",
+    "decode_bf_stream",
     "encode_text",
     "set_default_array_size",
+    "set_default_cache_dir",
     "set_default_int_size",
 )
 
 
+def _check_engine(engine: str) -> None:
+    if engine not in ENGINES:
+        raise ValueError(
+            f"Unknown engine {engine!r}, expected one of {', '.join(map(repr, ENGINES))}."
+        )
+
+
+def _input_buffer(
+    stdin: Optional[Union[InputSource, InputBuffer]], eof: EndOfInput
+) -> InputBuffer:
+    if isinstance(stdin, InputBuffer):
+        return stdin
+    return InputBuffer(stdin, eof=eof)
+
+
+# The amount of loop iterations between two checks of a deadline
+_DEADLINE_TICKS = 10000
+
+
+def _run_limited(
+    steps: Generator[Optional[int], Optional[int], None],
+    output: OutputBuffer,
+    max_steps: Optional[int],
+    max_output: Optional[int],
+    deadline: Optional[float],
+) -> None:
+    """Run an engine started with ``ticks`` from :func:`_grant` until it finishes, raising
+    :class:`BudgetExceededException` once it exceeds a limit."""
+    end = None if deadline is None else time.monotonic() + deadline
+    taken = 0
+    granted = _grant(max_steps, deadline, taken)
+    try:
+        remaining = next(steps)
+        while True:
+            taken += granted - (remaining or 0)
+            limit = None
+            if max_steps is not None and taken > max_steps:
+                limit = "max_steps"
+            elif max_output is not None and len(output) > max_output:
+                limit = "max_output"
+            elif end is not None and time.monotonic() >= end:
+                limit = "deadline"
+            if limit is not None:
+                raise BudgetExceededException(limit, output.text(), taken)
+            granted = _grant(max_steps, deadline, taken)
+            remaining = steps.send(granted)
+    except StopIteration:
+        pass
+    finally:
+        steps.close()
+
+
+def _grant(max_steps: Optional[int], deadline: Optional[float], taken: int) -> int:
+    """Get the amount of loop iterations an engine may run before it has to pause for the limits to be checked."""
+    granted = sys.maxsize if deadline is None else _DEADLINE_TICKS
+    if max_steps is not None:
+        # One more than what is left, so the engine pauses as soon as it goes over the limit
+        granted = min(granted, max_steps - taken + 1)
+    return granted
+
+
 class BrainfuckTools:
     """The BrainfuckTools class is a wrapper for the compiler, decoder and encoder methods.
 
@@ -31,15 +111,93 @@ class BrainfuckTools:
         The last decoded code.
     last_encoded: Optional[EncodedBrainfuck]
         The last encoded text.
+
+    Parameters
+    ----------
+    array_size: int
+        The size of the array.
+    int_size: IntegerSize
+        The amount of bits per integer.
+    engine: Engine
+        The engine used by :meth:`decode`. ``"compiler"`` compiles the code into python and runs it with :func:`exec`,
+        while ``"interpreter"`` runs the code directly with the :class:`BrainfuckInterpreter`, which skips code
+        generation entirely. ``"native"`` compiles the code into a shared library with the system's C compiler and
+        runs it with the :class:`NativeBrainfuck`, falling back to ``"compiler"`` with a :class:`RuntimeWarning` if
+        there is no C compiler. Whether there is one is only checked the first time the engine is used, so the warning
+        is only shown once. The libraries are stored in ``native`` in ``cache_dir`` if it is given, where they count
+        towards ``cache_dir_max_size``.
+    cache_size: int
+        The maximum amount of compiled programs to keep in a least recently used cache, so compiling or decoding the
+        same code again skips code generation and :func:`compile`. If this is ``0``, which is the default, nothing is
+        cached. :attr:`CompiledBrainfuck.program` is ``None`` for programs that come from the cache, while
+        :attr:`CompiledBrainfuck.raw_parsed` is parsed from the code again when it is first accessed.
+    cache_max_size: Optional[int]
+        The maximum size of the generated code kept in the cache, in bytes. If ``None``, only ``cache_size``
+        limits the cache.
+    cache_dir: Optional[Union[str, os.PathLike]]
+        A directory to store compiled programs in, so they are kept across process restarts. If ``None``, which is
+        the default, nothing is stored on disk.
+    cache_dir_max_size: Optional[int]
+        The maximum total size of the files in ``cache_dir``, in bytes. When it is exceeded, the least recently used
+        programs are removed. If ``None``, the size is not limited.
+    workers: Optional[int]
+        The amount of processes used by :meth:`compile_many` and :meth:`decode_many`. If ``None``, one process is
+        used for every CPU. The processes are started the first time they are needed and reused until :meth:`close`
+        is called, or the object is used as a context manager and the ``with`` block ends.
+
+    Raises
+    ------
+    ValueError
+        If ``engine`` is not a valid :data:`Engine`.
     """
 
-    def __init__(self, array_size: int = 30000, int_size: IntegerSize = 8) -> None:
+    def __init__(
+        self,
+        array_size: int = 30000,
+        int_size: IntegerSize = 8,
+        engine: Engine = "compiler",
+        cache_size: int = 0,
+        cache_max_size: Optional[int] = None,
+        cache_dir: Optional[Union[str, "os.PathLike[str]"]] = None,
+        cache_dir_max_size: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> None:
         self._array_size = array_size
         self._int_size = int_size
+        _check_engine(engine)
+        self._engine = engine
+        self._cache = CompileCache(cache_size, cache_max_size)
+        self._disk_cache: Optional[DiskCache] = None
+        if cache_dir is not None:
+            self._disk_cache = DiskCache(cache_dir, cache_dir_max_size)
+        self._workers = workers
+        # Whether there is a C compiler for the native engine, which is only checked once it is first used
+        self._native: Optional[bool] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
         self.last_compiled: Optional[CompiledBrainfuck] = None
         self.last_decoded: Optional[DecodedBrainfuck] = None
         self.last_encoded: Optional[EncodedBrainfuck] = None
 
+    def __enter__(self) -> "BrainfuckTools":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the processes used by :meth:`compile_many` and :meth:`decode_many`, waiting for them to finish.
+
+        They are started again if one of those methods is called afterwards.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
     @property
     def array_size(self) -> int:
         """The array size."""
@@ -50,6 +208,134 @@ class BrainfuckTools:
         """The integer size."""
         return self._int_size
 
+    @property
+    def engine(self) -> Engine:
+        """The engine used by :meth:`decode`."""
+        return self._engine
+
+    def cache_info(self) -> CacheInfo:
+        """Get statistics about the compile cache.
+
+        Returns
+        -------
+        CacheInfo
+            The statistics.
+        """
+        return self._cache.info()
+
+    def clear_cache(self) -> None:
+        """Remove every program from the compile cache and reset its statistics.
+
+        This also removes every program from ``cache_dir``, if it was given.
+        """
+        self._cache.clear()
+        if self._disk_cache is not None:
+            self._disk_cache.clear()
+
+    def _compile_into(
+        self,
+        compiler: CompiledBrainfuck,
+        code: str,
+        minify: Optional[bool],
+        optimize: bool,
+        fast: bool,
+        interruptible: bool = False,
+    ) -> CacheEntry:
+        key = ""
+        entry = None
+        if self._cache.enabled or self._disk_cache is not None:
+            key = CompileCache.make_key(
+                code,
+                self._array_size,
+                self._int_size,
+                minify,
+                optimize,
+                fast,
+                interruptible,
+            )
+            entry = self._cache.get(key)
+            if entry is None and self._disk_cache is not None:
+                entry = self._disk_cache.get(key)
+                if entry is not None:
+                    self._cache.put(key, entry)
+        if entry is not None:
+            compiler.result = entry.result
+            compiler._source = code  # pylint: disable=protected-access
+            compiler._body = entry.body  # pylint: disable=protected-access
+            compiler._fast = fast  # pylint: disable=protected-access
+            return entry
+        compiler.parse(
+            code,
+            minify=minify,
+            optimize=optimize,
+            fast=fast,
+            interruptible=interruptible,
+        )
+        entry = CacheEntry(compiler.result or "", compiler.body or "")
+        self._cache.put(key, entry)
+        if self._disk_cache is not None:
+            entry.code = compile(entry.body, "<bftools>", "exec")
+            self._disk_cache.put(key, entry)
+        return entry
+
+    def _execute(
+        self,
+        value: str,
+        engine: Engine,
+        optimize: bool,
+        output: OutputBuffer,
+        stdin: InputBuffer,
+        chunk_size: int = sys.maxsize,
+        ticks: Optional[int] = None,
+        profile: Optional[Profile] = None,
+    ) -> Generator[Optional[int], Optional[int], None]:
+        """Start running code with the given engine, see :meth:`BrainfuckInterpreter.execute`. With a ``profile``,
+        the interpreter is always used."""
+        if engine == "native" and profile is None:
+            if self._native is None:
+                self._native = NativeBrainfuck.available()
+                if not self._native:
+                    warnings.warn(
+                        "No C compiler was found, so the native engine falls back to the compiler engine.",
+                        RuntimeWarning,
+                    )
+            if self._native:
+                return NativeBrainfuck(
+                    array_size=self._array_size,
+                    int_size=self._int_size,
+                    disk_cache=self._disk_cache,
+                ).execute(
+                    value,
+                    output,
+                    optimize=optimize,
+                    chunk_size=chunk_size,
+                    stdin=stdin,
+                    ticks=-1 if ticks is None else ticks,
+                )
+        if engine == "interpreter" or profile is not None:
+            return BrainfuckInterpreter(
+                array_size=self._array_size, int_size=self._int_size
+            ).execute(
+                value,
+                output,
+                optimize=optimize,
+                chunk_size=chunk_size,
+                stdin=stdin,
+                ticks=-1 if ticks is None else ticks,
+                profile=profile,
+            )
+        compiler = CompiledBrainfuck(
+            array_size=self._array_size, int_size=self._int_size
+        )
+        entry = self._compile_into(
+            compiler, value, False, optimize, True, ticks is not None
+        )
+        if entry.code is None:
+            entry.code = compile(entry.body, "<bftools>", "exec")
+        return DecodedBrainfuck.execute(
+            entry.code, output, chunk_size, stdin=stdin, ticks=ticks
+        )
+
     def _new_compiler(self) -> CompiledBrainfuck:
         compiler = CompiledBrainfuck(
             array_size=self._array_size, int_size=self._int_size
@@ -67,7 +353,13 @@ class BrainfuckTools:
         self.last_encoded = encoder
         return encoder
 
-    def compile(self, code: str, minify: Optional[bool] = None) -> CompiledBrainfuck:
+    def compile(
+        self,
+        code: str,
+        minify: Optional[bool] = None,
+        optimize: bool = True,
+        fast: bool = False,
+    ) -> CompiledBrainfuck:
         """
         Compiles a brainfuck code into python code.
 
@@ -77,6 +369,11 @@ class BrainfuckTools:
             The brainfuck code to compile.
         minify: Optional[bool]
             Whether to minify the code or not.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` or not.
+        fast: bool
+            Whether to generate a single function with every instruction inlined, which runs much faster but is harder
+            to read. See :meth:`CompiledBrainfuck.parse`.
 
         Returns
         -------
@@ -84,45 +381,532 @@ class BrainfuckTools:
             The compiled code.
         """
         compiler = self._new_compiler()
-        compiler.parse(code, minify=minify)
+        self._compile_into(compiler, code, minify, optimize, fast)
         return compiler
 
-    def decode(self, value: str) -> DecodedBrainfuck:
+    def _run_many(
+        self,
+        batch: Any,
+        options: Any,
+        codes: Iterable[str],
+        chunksize: int,
+        ordered: bool,
+    ) -> Iterator[BatchResult]:
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be at least 1, not {chunksize}.")
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self._workers)
+        options.update(array_size=self._array_size, int_size=self._int_size)
+        # Keep every process busy, without reading every program into memory at once
+        max_pending = 2 * (self._workers or os.cpu_count() or 1)
+        return run_batches(
+            self._executor, batch, options, codes, chunksize, max_pending, ordered
+        )
+
+    def compile_many(
+        self,
+        codes: Iterable[str],
+        minify: Optional[bool] = None,
+        optimize: bool = True,
+        fast: bool = False,
+        chunksize: int = 16,
+        ordered: bool = True,
+    ) -> Iterator[BatchResult]:
+        """Compiles many brainfuck programs into python code in parallel, using a pool of processes.
+
+        The programs are read from ``codes`` as the processes need them, so it can be a generator of any length. The
+        cache is not used.
+
+        Parameters
+        ----------
+        codes: Iterable[str]
+            The brainfuck programs to compile.
+        minify: Optional[bool]
+            Whether to minify the code or not.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` or not.
+        fast: bool
+            Whether to generate a single function with every instruction inlined, see :meth:`compile`.
+        chunksize: int
+            The amount of programs sent to a process at once. Larger chunks have less overhead for small programs,
+            while smaller chunks spread the work more evenly.
+        ordered: bool
+            Whether to yield the results in the order of ``codes``. If ``False``, they are yielded as soon as their
+            chunk has finished, and :attr:`BatchResult.position` tells which program they belong to.
+
+        Yields
+        ------
+        BatchResult
+            The result of each program. If a program fails, for example because its brackets do not match up, the
+            exception is stored in :attr:`BatchResult.error` and the other programs are not affected.
+
+        Raises
+        ------
+        ValueError
+            If ``chunksize`` is smaller than ``1``.
+        """
+        return self._run_many(
+            _compile_batch,
+            {"minify": minify, "optimize": optimize, "fast": fast},
+            codes,
+            chunksize,
+            ordered,
+        )
+
+    def decode_many(
+        self,
+        codes: Iterable[str],
+        engine: Optional[Engine] = None,
+        optimize: bool = True,
+        chunksize: int = 16,
+        ordered: bool = True,
+    ) -> Iterator[BatchResult]:
+        """Decodes many brainfuck programs into text in parallel, using a pool of processes.
+
+        The programs are read from ``codes`` as the processes need them, so it can be a generator of any length. The
+        programs get no input.
+
+        Parameters
+        ----------
+        codes: Iterable[str]
+            The brainfuck programs to decode.
+        engine: Optional[Engine]
+            The engine to decode with. If ``None``, :attr:`engine` is used.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` or not.
+        chunksize: int
+            The amount of programs sent to a process at once, see :meth:`compile_many`.
+        ordered: bool
+            Whether to yield the results in the order of ``codes``, see :meth:`compile_many`.
+
+        Yields
+        ------
+        BatchResult
+            The result of each program. If a program fails, the exception is stored in :attr:`BatchResult.error`
+            and the other programs are not affected.
+
+        Raises
+        ------
+        ValueError
+            If ``engine`` is not a valid :data:`Engine`, or ``chunksize`` is smaller than ``1``.
+        """
+        if engine is None:
+            engine = self._engine
+        _check_engine(engine)
+        return self._run_many(
+            _decode_batch,
+            {"engine": engine, "optimize": optimize},
+            codes,
+            chunksize,
+            ordered,
+        )
+
+    def compile_stream(
+        self,
+        source: Union[IO[str], Iterable[str]],
+        destination: IO[str],
+        optimize: bool = True,
+        fast: bool = False,
+        chunk_size: int = 65536,
+    ) -> None:
+        """Compiles brainfuck code into python code one chunk at a time, writing it to ``destination`` as it goes.
+
+        Only one chunk of the code is held in memory at a time, so this can compile code that is much larger than the
+        available memory. The generated code is never minified or cached, and this does not change
+        :attr:`last_compiled`.
+
+        Parameters
+        ----------
+        source: Union[IO[str], Iterable[str]]
+            The brainfuck code to compile, as a file object opened in text mode or an iterable of chunks.
+        destination: IO[str]
+            The file object opened in text mode to write the python code to.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_stream` or not.
+        fast: bool
+            Whether to generate a single function with every instruction inlined, see :meth:`compile`.
+        chunk_size: int
+            The amount of characters to read from ``source`` at once, if it is a file object.
+
+        Raises
+        ------
+        UnbalancedBracketsException
+            If the brackets in the code do not match up. The code before the bracket has already been written to
+            ``destination``.
+        TypeError
+            If ``source`` is a file object opened in binary mode, or a chunk is not a :class:`str`.
+        """
+        compiler = CompiledBrainfuck(
+            array_size=self._array_size, int_size=self._int_size
+        )
+        compiler.parse_stream(
+            source, destination, optimize=optimize, fast=fast, chunk_size=chunk_size
+        )
+
+    def decode(
+        self,
+        value: str,
+        engine: Optional[Engine] = None,
+        optimize: bool = True,
+        output: Optional[OutputBuffer] = None,
+        stdin: Optional[Union[InputSource, InputBuffer]] = None,
+        eof: EndOfInput = "leave",
+        max_steps: Optional[int] = None,
+        max_output: Optional[int] = None,
+        deadline: Optional[float] = None,
+        profile: bool = False,
+    ) -> DecodedBrainfuck:
         """Decodes brainfuck code into text.
 
+        The limits make it safe to decode code you do not trust, which could otherwise loop forever or output more
+        than fits in memory. They are checked when the code reaches the end of a loop, so code without loops,
+        which always finishes, is never checked for ``max_steps`` or ``deadline``. Reading from :data:`sys.stdin` is
+        not limited.
+
         Parameters
         ----------
         value: str
             The brainfuck code to decode.
+        engine: Optional[Engine]
+            The engine to decode with. If ``None``, :attr:`engine` is used.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` or not.
+        output: Optional[OutputBuffer]
+            The buffer to write the raw output values to, for example to write them into your own
+            :class:`bytearray` or to decode them with a specific encoding. If ``None``, a new one is created. The
+            buffer is available as :attr:`DecodedBrainfuck.output` afterwards.
+        stdin: Optional[Union[InputSource, InputBuffer]]
+            The input of the code, such as :class:`bytes`, a :class:`str`, a file object or an iterable of chunks, see
+            :class:`InputBuffer`. If ``None``, the input is read from :data:`sys.stdin`.
+        eof: EndOfInput
+            What an input does to the current cell once there is no more input, see :class:`InputBuffer`. This is
+            ignored if ``stdin`` is an :class:`InputBuffer`.
+        max_steps: Optional[int]
+            The maximum amount of loop iterations to run. If ``None``, it is not limited. Loops that are replaced by
+            ``optimize``, such as ``[-]``, do not count, except for scans like ``[>]``, whose steps each count as an
+            iteration since they may never end.
+        max_output: Optional[int]
+            The maximum amount of values to output. If ``None``, it is not limited.
+        deadline: Optional[float]
+            The maximum amount of seconds to run for. If ``None``, it is not limited. This is checked every few
+            thousand loop iterations, so the code may run slightly longer.
+        profile: bool
+            Whether to count how often every instruction runs and how long every loop takes, see :class:`Profile`.
+            The profile is available as :attr:`DecodedBrainfuck.profile` afterwards. This always uses the
+            interpreter, and makes it several times slower.
 
         Returns
         -------
         DecodedBrainfuck
             The decoded code.
+
+        Raises
+        ------
+        ValueError
+            If ``engine`` is not a valid :data:`Engine`, ``eof`` is not a valid :data:`EndOfInput`, or ``max_steps``
+            or ``max_output`` is negative.
+        BudgetExceededException
+            If the code exceeds one of the limits. The exception holds the text that was output until then.
         """
+        if engine is None:
+            engine = self._engine
+        _check_engine(engine)
+        stdin = _input_buffer(stdin, eof)
+        if output is None:
+            output = OutputBuffer(self._int_size)
+        if (
+            max_steps is not None
+            or max_output is not None
+            or deadline is not None
+            or profile
+            or engine == "native"
+        ):
+            if (max_steps is not None and max_steps < 0) or (
+                max_output is not None and max_output < 0
+            ):
+                raise ValueError("max_steps and max_output can not be negative.")
+            chunk_size = sys.maxsize if max_output is None else max_output + 1
+            decoder = self._new_decoder()
+            if profile:
+                program = parse_program(value)
+                if optimize:
+                    program = optimize_program(program, self._int_size)
+                decoder.profile = Profile(program)
+            _run_limited(
+                self._execute(
+                    value,
+                    engine,
+                    optimize,
+                    output,
+                    stdin,
+                    chunk_size,
+                    _grant(max_steps, deadline, 0),
+                    decoder.profile,
+                ),
+                output,
+                max_steps,
+                max_output,
+                deadline,
+            )
+            decoder.output = output
+            decoder.result = output.text()
+            return decoder
+        if engine == "interpreter":
+            decoder = self._new_decoder()
+            decoder.interpret(
+                value,
+                array_size=self._array_size,
+                int_size=self._int_size,
+                optimize=optimize,
+                output=output,
+                stdin=stdin,
+            )
+            return decoder
         compiler = CompiledBrainfuck(
             array_size=self._array_size, int_size=self._int_size
         )
-        compiler.parse(value)
+        entry = self._compile_into(compiler, value, False, optimize, True)
+        if entry.code is None:
+            entry.code = compile(entry.body, "<bftools>", "exec")
         decoder = self._new_decoder()
-        decoder.parse(compiler.result or "")
+        decoder.run(entry.code, output, stdin=stdin)
         return decoder
 
-    def encode(self, value: str) -> EncodedBrainfuck:
+    def decode_stream(
+        self,
+        value: str,
+        chunk_size: int = 4096,
+        engine: Optional[Engine] = None,
+        optimize: bool = True,
+        encoding: Optional[str] = None,
+        errors: str = "strict",
+        stdin: Optional[Union[InputSource, InputBuffer]] = None,
+        eof: EndOfInput = "leave",
+    ) -> Iterator[str]:
+        """Decodes brainfuck code into text, yielding the text while the code is still running.
+
+        The code is paused every time it has output ``chunk_size`` values, until the text they make up has been
+        consumed. Only one chunk is held in memory at a time, so this can be used for programs with a huge output, and
+        the first text is available long before the program finishes.
+
+        This does not change :attr:`last_decoded`.
+
+        Parameters
+        ----------
+        value: str
+            The brainfuck code to decode.
+        chunk_size: int
+            The amount of values to output before yielding them. Every chunk but the last one contains at least this
+            many characters, unless ``encoding`` is given.
+        engine: Optional[Engine]
+            The engine to decode with. If ``None``, :attr:`engine` is used.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` or not.
+        encoding: Optional[str]
+            The encoding used to decode the values, see :class:`OutputBuffer`.
+        errors: str
+            The error handling scheme used with ``encoding``, see :meth:`bytes.decode`.
+        stdin: Optional[Union[InputSource, InputBuffer]]
+            The input of the code, such as :class:`bytes`, a :class:`str`, a file object or an iterable of chunks, see
+            :class:`InputBuffer`. If ``None``, the input is read from :data:`sys.stdin`.
+        eof: EndOfInput
+            What an input does to the current cell once there is no more input, see :class:`InputBuffer`. This is
+            ignored if ``stdin`` is an :class:`InputBuffer`.
+
+        Yields
+        ------
+        str
+            The text, one chunk at a time. Empty chunks are skipped.
+
+        Raises
+        ------
+        ValueError
+            If ``engine`` is not a valid :data:`Engine`, ``eof`` is not a valid :data:`EndOfInput`, or ``chunk_size``
+            is smaller than ``1``.
+        """
+        if engine is None:
+            engine = self._engine
+        _check_engine(engine)
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, not {chunk_size}.")
+        stdin = _input_buffer(stdin, eof)
+        output = OutputBuffer(self._int_size, encoding=encoding, errors=errors)
+        steps = self._execute(value, engine, optimize, output, stdin, chunk_size)
+        for _ in steps:
+            text = output.drain()
+            if text:
+                yield text
+        text = output.drain(final=True)
+        if text:
+            yield text
+
+    async def adecode(
+        self,
+        value: str,
+        engine: Optional[Engine] = None,
+        optimize: bool = True,
+        output: Optional[OutputBuffer] = None,
+        stdin: Optional[Union[InputSource, InputBuffer]] = None,
+        eof: EndOfInput = "leave",
+        ticks: int = 10000,
+    ) -> DecodedBrainfuck:
+        """Decodes brainfuck code into text without blocking the event loop.
+
+        The code runs in the thread of the event loop, but it is paused every ``ticks`` loop iterations to let other
+        tasks run. Cancelling the task, for example with :func:`asyncio.wait_for` or ``asyncio.timeout``, stops the
+        code the next time it is paused. Compiling the code, which happens before it runs, and reading the input are
+        not paused, so ``stdin`` should not be left to read from :data:`sys.stdin`.
+
+        Parameters
+        ----------
+        value: str
+            The brainfuck code to decode.
+        engine: Optional[Engine]
+            The engine to decode with. If ``None``, :attr:`engine` is used.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` or not.
+        output: Optional[OutputBuffer]
+            The buffer to write the raw output values to, see :meth:`decode`.
+        stdin: Optional[Union[InputSource, InputBuffer]]
+            The input of the code, see :meth:`decode`.
+        eof: EndOfInput
+            What an input does to the current cell once there is no more input, see :class:`InputBuffer`.
+        ticks: int
+            The amount of loop iterations to run before letting other tasks run. Every run of the body of a loop counts as
+            an iteration, like every step of a scan such as ``[>]``, so code without loops is never paused. Smaller values make the event loop more
+            responsive, but the code slower.
+
+        Returns
+        -------
+        DecodedBrainfuck
+            The decoded code.
+
+        Raises
+        ------
+        ValueError
+            If ``engine`` is not a valid :data:`Engine`, ``eof`` is not a valid :data:`EndOfInput`, or ``ticks`` is
+            smaller than ``1``.
+        """
+        if engine is None:
+            engine = self._engine
+        _check_engine(engine)
+        if ticks < 1:
+            raise ValueError(f"ticks must be at least 1, not {ticks}.")
+        stdin = _input_buffer(stdin, eof)
+        if output is None:
+            output = OutputBuffer(self._int_size)
+        steps = self._execute(value, engine, optimize, output, stdin, ticks=ticks)
+        try:
+            next(steps)
+            while True:
+                await asyncio.sleep(0)
+                steps.send(ticks)
+        except StopIteration:
+            pass
+        finally:
+            steps.close()
+        decoder = self._new_decoder()
+        decoder.output = output
+        decoder.result = output.text()
+        self.last_decoded = decoder
+        return decoder
+
+    async def acompile(
+        self,
+        code: str,
+        minify: Optional[bool] = None,
+        optimize: bool = True,
+        fast: bool = False,
+    ) -> CompiledBrainfuck:
+        """Compiles a brainfuck code into python code in the default executor of the event loop, see :meth:`compile`.
+
+        Cancelling the task stops waiting for the result, but the code is still compiled.
+
+        Parameters
+        ----------
+        code: str
+            The brainfuck code to compile.
+        minify: Optional[bool]
+            Whether to minify the code or not.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` or not.
+        fast: bool
+            Whether to generate a single function with every instruction inlined, see :meth:`compile`.
+
+        Returns
+        -------
+        CompiledBrainfuck
+            The compiled code.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                self.compile, code, minify=minify, optimize=optimize, fast=fast
+            ),
+        )
+
+    async def aencode(
+        self, value: str, strategy: EncodingStrategy = "absolute"
+    ) -> EncodedBrainfuck:
+        """Encodes text into brainfuck code in the default executor of the event loop, see :meth:`encode`.
+
+        Cancelling the task stops waiting for the result, but the text is still encoded.
+
+        Parameters
+        ----------
+        value: str
+            The text to encode.
+        strategy: EncodingStrategy
+            How to encode the characters, see :meth:`EncodedBrainfuck.parse`.
+
+        Returns
+        -------
+        EncodedBrainfuck
+            The encoded text.
+
+        Raises
+        ------
+        ValueError
+            If ``strategy`` is not a valid :data:`EncodingStrategy`.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.encode, value, strategy=strategy)
+        )
+
+    def encode(
+        self,
+        value: str,
+        strategy: EncodingStrategy = "absolute",
+        workers: Optional[int] = None,
+        chunk_size: int = 65536,
+    ) -> EncodedBrainfuck:
         """Encodes text into brainfuck code.
 
         Parameters
         ----------
         value: str
             The text to encode.
+        strategy: EncodingStrategy
+            How to encode the characters, see :meth:`EncodedBrainfuck.parse`. ``"delta"`` produces much shorter code
+            for text where consecutive characters are close to each other, such as lowercase words.
+        workers: Optional[int]
+            The amount of processes to encode large texts with, see :meth:`EncodedBrainfuck.parse`. If ``None``, the
+            text is encoded in this process.
+        chunk_size: int
+            The amount of characters each process encodes at once when using ``workers``.
 
         Returns
         -------
         EncodedBrainfuck
             The encoded text.
+
+        Raises
+        ------
+        ValueError
+            If ``strategy`` is not a valid :data:`EncodingStrategy`.
         """
         encoder = self._new_encoder()
-        encoder.parse(value)
+        encoder.parse(value, strategy=strategy, workers=workers, chunk_size=chunk_size)
         return encoder
 
 
@@ -174,8 +958,33 @@ def set_default_int_size(size: IntegerSize) -> None:
     _get_instance()._int_size = size  # pylint: disable=protected-access
 
 
+def set_default_cache_dir(
+    directory: Optional[Union[str, "os.PathLike[str]"]], max_size: Optional[int] = None
+) -> None:
+    """Sets the directory compiled programs are stored in by the :func:`compile_bf` and :func:`decode_bf` functions,
+    so they are kept across process restarts.
+
+    Parameters
+    ----------
+    directory: Optional[Union[str, os.PathLike]]
+        The directory to store programs in. If ``None``, programs are no longer stored.
+    max_size: Optional[int]
+        The maximum total size of the files in the directory, in bytes. When it is exceeded, the least recently used
+        programs are removed. If ``None``, the size is not limited.
+    """
+    instance = _get_instance()
+    instance._disk_cache = (  # pylint: disable=protected-access
+        None if directory is None else DiskCache(directory, max_size)
+    )
+
+
 # Some shortcuts
-def compile_bf(code: str, minify: Optional[bool] = None) -> CompiledBrainfuck:
+def compile_bf(
+    code: str,
+    minify: Optional[bool] = None,
+    optimize: bool = True,
+    fast: bool = False,
+) -> CompiledBrainfuck:
     """Shortcut for :meth:`BrainfuckTools.compile`.
 
     This is equivalent to ``BrainfuckTools().compile(code)``.
@@ -184,16 +993,63 @@ def compile_bf(code: str, minify: Optional[bool] = None) -> CompiledBrainfuck:
     ----------
     code: str
         The brainfuck code to compile.
+    minify: Optional[bool]
+        Whether to minify the code or not.
+    optimize: bool
+        Whether to optimize the code with :func:`optimize_program` or not.
+    fast: bool
+        Whether to generate a single function with every instruction inlined, which runs much faster but is harder to
+        read.
 
     Returns
     -------
     CompiledBrainfuck
         The compiled code.
     """
-    return _get_instance().compile(code, minify=minify)
+    return _get_instance().compile(code, minify=minify, optimize=optimize, fast=fast)
+
+
+def compile_bf_stream(
+    source: Union[IO[str], Iterable[str]],
+    destination: IO[str],
+    optimize: bool = True,
+    fast: bool = False,
+    chunk_size: int = 65536,
+) -> None:
+    """Shortcut for :meth:`BrainfuckTools.compile_stream`.
+
+    This is equivalent to ``BrainfuckTools().compile_stream(source, destination)``.
+
+    Parameters
+    ----------
+    source: Union[IO[str], Iterable[str]]
+        The brainfuck code to compile, as a file object opened in text mode or an iterable of chunks.
+    destination: IO[str]
+        The file object opened in text mode to write the python code to.
+    optimize: bool
+        Whether to optimize the code with :func:`optimize_stream` or not.
+    fast: bool
+        Whether to generate a single function with every instruction inlined.
+    chunk_size: int
+        The amount of characters to read from ``source`` at once, if it is a file object.
+    """
+    _get_instance().compile_stream(
+        source, destination, optimize=optimize, fast=fast, chunk_size=chunk_size
+    )
 
 
-def decode_bf(code: str) -> DecodedBrainfuck:
+def decode_bf(
+    code: str,
+    engine: Optional[Engine] = None,
+    optimize: bool = True,
+    output: Optional[OutputBuffer] = None,
+    stdin: Optional[Union[InputSource, InputBuffer]] = None,
+    eof: EndOfInput = "leave",
+    max_steps: Optional[int] = None,
+    max_output: Optional[int] = None,
+    deadline: Optional[float] = None,
+    profile: bool = False,
+) -> DecodedBrainfuck:
     """Shortcut for :meth:`BrainfuckTools.decode`.
 
     This is equivalent to ``BrainfuckTools().decode(code)``.
@@ -202,16 +1058,105 @@ def decode_bf(code: str) -> DecodedBrainfuck:
     ----------
     code: str
         The brainfuck code to decode.
+    engine: Optional[Engine]
+        The engine to decode with. If ``None``, the default engine is used.
+    optimize: bool
+        Whether to optimize the code with :func:`optimize_program` or not.
+    output: Optional[OutputBuffer]
+        The buffer to write the raw output values to. If ``None``, a new one is created.
+    stdin: Optional[Union[InputSource, InputBuffer]]
+        The input of the code, see :class:`InputBuffer`. If ``None``, the input is read from :data:`sys.stdin`.
+    eof: EndOfInput
+        What an input does to the current cell once there is no more input, see :class:`InputBuffer`.
+    max_steps: Optional[int]
+        The maximum amount of loop iterations to run, see :meth:`BrainfuckTools.decode`.
+    max_output: Optional[int]
+        The maximum amount of values to output.
+    deadline: Optional[float]
+        The maximum amount of seconds to run for.
+    profile: bool
+        Whether to collect a :class:`Profile` of the code.
 
     Returns
     -------
     DecodedBrainfuck
         The decoded text.
+
+    Raises
+    ------
+    BudgetExceededException
+        If the code exceeds one of the limits.
+    """
+    return _get_instance().decode(
+        code,
+        engine=engine,
+        optimize=optimize,
+        output=output,
+        stdin=stdin,
+        eof=eof,
+        max_steps=max_steps,
+        max_output=max_output,
+        deadline=deadline,
+        profile=profile,
+    )
+
+
+def decode_bf_stream(
+    code: str,
+    chunk_size: int = 4096,
+    engine: Optional[Engine] = None,
+    optimize: bool = True,
+    encoding: Optional[str] = None,
+    errors: str = "strict",
+    stdin: Optional[Union[InputSource, InputBuffer]] = None,
+    eof: EndOfInput = "leave",
+) -> Iterator[str]:
+    """Shortcut for :meth:`BrainfuckTools.decode_stream`.
+
+    This is equivalent to ``BrainfuckTools().decode_stream(code)``.
+
+    Parameters
+    ----------
+    code: str
+        The brainfuck code to decode.
+    chunk_size: int
+        The amount of values to output before yielding them.
+    engine: Optional[Engine]
+        The engine to decode with. If ``None``, the default engine is used.
+    optimize: bool
+        Whether to optimize the code with :func:`optimize_program` or not.
+    encoding: Optional[str]
+        The encoding used to decode the values, see :class:`OutputBuffer`.
+    errors: str
+        The error handling scheme used with ``encoding``, see :meth:`bytes.decode`.
+    stdin: Optional[Union[InputSource, InputBuffer]]
+        The input of the code, see :class:`InputBuffer`. If ``None``, the input is read from :data:`sys.stdin`.
+    eof: EndOfInput
+        What an input does to the current cell once there is no more input, see :class:`InputBuffer`.
+
+    Yields
+    ------
+    str
+        The text, one chunk at a time.
     """
-    return _get_instance().decode(code)
+    return _get_instance().decode_stream(
+        code,
+        chunk_size=chunk_size,
+        engine=engine,
+        optimize=optimize,
+        encoding=encoding,
+        errors=errors,
+        stdin=stdin,
+        eof=eof,
+    )
 
 
-def encode_text(value: str) -> EncodedBrainfuck:
+def encode_text(
+    value: str,
+    strategy: EncodingStrategy = "absolute",
+    workers: Optional[int] = None,
+    chunk_size: int = 65536,
+) -> EncodedBrainfuck:
     """Shortcut for :meth:`BrainfuckTools.encode`.
 
     This is equivalent to ``BrainfuckTools().encode(text)``.
@@ -220,10 +1165,18 @@ def encode_text(value: str) -> EncodedBrainfuck:
     ----------
     value: str
         The text to encode.
+    strategy: EncodingStrategy
+        How to encode the characters, see :meth:`EncodedBrainfuck.parse`.
+    workers: Optional[int]
+        The amount of processes to encode large texts with. If ``None``, the text is encoded in this process.
+    chunk_size: int
+        The amount of characters each process encodes at once when using ``workers``.
 
     Returns
     -------
     EncodedBrainfuck
         The encoded text.
     """
-    return _get_instance().encode(value)
+    return _get_instance().encode(
+        value, strategy=strategy, workers=workers, chunk_size=chunk_size
+    )
@@ -1,7 +1,12 @@
 import io
-from typing import IO, Optional
+import sys
+from types import CodeType
+from typing import IO, Any, Dict, Generator, Optional, Union
 
-from .base import BrainfuckBase
+from .base import BrainfuckBase, IntegerSize
+from .buffers import InputBuffer, OutputBuffer
+from .interpreter import BrainfuckInterpreter
+from .profiler import Profile
 
 __all__ = ("DecodedBrainfuck",)
 
@@ -22,9 +27,20 @@ class DecodedBrainfuck(BrainfuckBase):
         The result text. This will never be ``None`` unless :meth:`parse` has not been called. Since the library
         always calls :meth:`parse` before returning the object, this should never happen unless you override the
         functionality of the library.
+    output: Optional[OutputBuffer]
+        The raw values that were output, if the code was run with :meth:`run` or :meth:`interpret`.
+    profile: Optional[Profile]
+        The execution counts of the code, if it was decoded with ``profile=True``.
     """
 
-    def parse(self, value: str) -> None:
+    def __init__(self) -> None:
+        super().__init__()
+        self.output: Optional[OutputBuffer] = None
+        self.profile: Optional[Profile] = None
+
+    def parse(
+        self, value: Union[str, CodeType], namespace: Optional[Dict[str, Any]] = None
+    ) -> None:
         """Parse the given code.
 
         .. note::
@@ -39,8 +55,11 @@ class DecodedBrainfuck(BrainfuckBase):
 
         Parameters
         ----------
-        value: str
-            The code to parse.
+        value: Union[str, CodeType]
+            The code to parse, or the code object it was compiled into.
+        namespace: Optional[Dict[str, Any]]
+            The namespace to run the code in, such as one from :meth:`CompiledBrainfuck.create_namespace`. If
+            ``None``, the code is run in an empty namespace, so it needs to contain its own runtime.
 
         Raises
         ------
@@ -58,8 +77,153 @@ class DecodedBrainfuck(BrainfuckBase):
         ) -> None:
             print(*values, sep=sep, end=end, file=file, flush=flush)
 
+        if namespace is None:
+            namespace = {}
         # We want to override the builtin print function with _print
-        exec(value, {"print": _print})  # pylint: disable=exec-used  # nosec B102
+        namespace["print"] = _print
+        exec(value, namespace)  # pylint: disable=exec-used  # nosec B102
         out = code_out.getvalue()
         code_out.close()
         self.result = out
+
+    def run(
+        self,
+        value: Union[str, CodeType],
+        output: OutputBuffer,
+        namespace: Optional[Dict[str, Any]] = None,
+        stdin: Optional[InputBuffer] = None,
+    ) -> None:
+        """Run code generated by :meth:`CompiledBrainfuck.parse` with ``fast=True``.
+
+        .. note::
+            You should not need to use this method. It is intended for internal use only, so you should only need to use
+            it if you override the functionality of the library.
+
+        .. warning::
+            This method uses the :func:`exec` function, see :meth:`parse`.
+
+        Parameters
+        ----------
+        value: Union[str, CodeType]
+            The code to run, which must define ``main(output, chunk_size, read)``, like :attr:`CompiledBrainfuck.body`. It
+            can also be the code object it was compiled into.
+        output: OutputBuffer
+            The buffer to write the output to.
+        namespace: Optional[Dict[str, Any]]
+            The namespace to run the code in. If ``None``, an empty namespace is used.
+        stdin: Optional[InputBuffer]
+            The buffer to read the input from. If ``None``, the input is read from :data:`sys.stdin`.
+
+        Raises
+        ------
+        SyntaxError
+            If the code is not syntactically correct.
+        """
+        for _ in self.execute(value, output, namespace=namespace, stdin=stdin):
+            pass
+        self.output = output
+        self.result = output.text()
+
+    @staticmethod
+    def execute(
+        value: Union[str, CodeType],
+        output: OutputBuffer,
+        chunk_size: int = sys.maxsize,
+        namespace: Optional[Dict[str, Any]] = None,
+        stdin: Optional[InputBuffer] = None,
+        ticks: Optional[int] = None,
+    ) -> Generator[Optional[int], Optional[int], None]:
+        """Start code generated by :meth:`CompiledBrainfuck.parse` with ``fast=True``, pausing whenever enough output
+        has been written.
+
+        .. note::
+            You should not need to use this method. It is intended for internal use only, so you should only need to use
+            it if you override the functionality of the library.
+
+        .. warning::
+            This method uses the :func:`exec` function, see :meth:`parse`.
+
+        Parameters
+        ----------
+        value: Union[str, CodeType]
+            The code to run, see :meth:`run`.
+        output: OutputBuffer
+            The buffer to write the output to.
+        chunk_size: int
+            The amount of values after which to pause.
+        namespace: Optional[Dict[str, Any]]
+            The namespace to run the code in. If ``None``, an empty namespace is used.
+        stdin: Optional[InputBuffer]
+            The buffer to read the input from. If ``None``, the input is read from :data:`sys.stdin`.
+        ticks: Optional[int]
+            The amount of loop iterations after which to pause, for code generated with ``interruptible=True``. This
+            must be ``None`` for any other code.
+
+        Returns
+        -------
+        Generator[Optional[int], Optional[int], None]
+            A generator, which yields every time ``output`` holds at least ``chunk_size`` values, and once more when
+            the code has finished. The caller is expected to empty ``output`` before resuming it, for example with
+            :meth:`OutputBuffer.drain`. Interruptible code also yields every ``ticks`` loop iterations, see
+            :meth:`CompiledBrainfuck.parse`.
+
+        Raises
+        ------
+        SyntaxError
+            If the code is not syntactically correct.
+        """
+        if namespace is None:
+            namespace = {}
+        exec(value, namespace)  # pylint: disable=exec-used  # nosec B102
+        if stdin is None:
+            stdin = InputBuffer()
+        arguments = [output.buffer, chunk_size, stdin.read]
+        if ticks is not None:
+            arguments.append(ticks)
+        steps: Generator[Optional[int], Optional[int], None] = namespace["main"](
+            *arguments
+        )
+        return steps
+
+    def interpret(
+        self,
+        value: str,
+        array_size: int = 30000,
+        int_size: IntegerSize = 8,
+        optimize: bool = True,
+        output: Optional[OutputBuffer] = None,
+        stdin: Optional[InputBuffer] = None,
+    ) -> None:
+        """Run the given brainfuck code with the :class:`BrainfuckInterpreter`.
+
+        .. note::
+            You should not need to use this method. It is intended for internal use only, so you should only need to use
+            it if you override the functionality of the library. Unlike :meth:`parse`, this method takes brainfuck code
+            and does not use :func:`exec`.
+
+        Parameters
+        ----------
+        value: str
+            The brainfuck code to run.
+        array_size: int
+            The size of the array.
+        int_size: IntegerSize
+            The amount of bits per integer.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` before running it.
+        output: Optional[OutputBuffer]
+            The buffer to write the output to. If ``None``, a new one is created.
+        stdin: Optional[InputBuffer]
+            The buffer to read the input from. If ``None``, the input is read from :data:`sys.stdin`.
+
+        Raises
+        ------
+        UnbalancedBracketsException
+            If the brackets in the code do not match up.
+        """
+        if output is None:
+            output = OutputBuffer(int_size)
+        self.output = output
+        self.result = BrainfuckInterpreter(
+            array_size=array_size, int_size=int_size
+        ).run(value, optimize=optimize, output=output, stdin=stdin)
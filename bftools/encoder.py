@@ -1,9 +1,139 @@
-from .base import BrainfuckBase, HasSizes, IntegerSize
+import functools
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .base import (
+    ENCODING_STRATEGIES,
+    BrainfuckBase,
+    EncodingStrategy,
+    HasSizes,
+    IntegerSize,
+)
 from .tools import factor_optimized
 
 __all__ = ("EncodedBrainfuck",)
 
 
+def _to_bf(value: int) -> str:
+    return ("+" if value > 0 else "-") * abs(value)
+
+
+def _encode_value(number: int, int_size: IntegerSize) -> str:
+    """Encode a single character value into code that prints it, then moves to a new cell."""
+    added = 0
+    # Use a walrus operator here when we drop support for Python 3.7
+    factored = factor_optimized(number + added, int_size)
+    while len(factored) < 2:  # Does this cause an error for prime numbers?
+        added += 1
+        factored = factor_optimized(number + added, int_size)
+    return (
+        ">" * (len(factored) - 1)
+        + _to_bf(factored[0])
+        + "".join(f"[<{_to_bf(val)}" for val in factored[1:])
+        + ">-]" * (len(factored) - 1)
+        + "<" * (len(factored) - 1)
+        + _to_bf(-added)
+        + ".>"
+    )
+
+
+# Only these character values are kept in the shared tables, so texts with many different characters, which is only
+# possible above 8 bits, can not make them grow without bound
+_SHARED_VALUES = 256
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding_table(int_size: IntegerSize) -> Dict[int, str]:
+    """Get the code of every character value below ``_SHARED_VALUES`` that has been encoded so far with the given
+    integer size.
+
+    The table is filled lazily by :meth:`EncodedBrainfuck.parse`, so it only ever holds the characters that were
+    actually encoded. Other characters are encoded again for every text.
+    """
+    return {}
+
+
+@functools.lru_cache(maxsize=4096)
+def _delta_code(difference: int) -> str:
+    """Get the shortest code that adds ``difference`` to the current cell.
+
+    This is either a run of ``+`` or ``-``, or a loop that uses the cell to the right, which must be zero, as its
+    counter. The cost of the code is its length, which is also the amount of instructions a decoder runs outside of
+    the loop.
+    """
+    best = _to_bf(difference)
+    size = abs(difference)
+    sign = 1 if difference > 0 else -1
+    for counter in range(2, int(math.sqrt(size)) + 2):
+        step = (size + counter // 2) // counter * sign
+        rest = difference - counter * step
+        # ">" + counter + "[<" + step + ">-]<" + rest
+        if counter + abs(step) + abs(rest) + 7 < len(best):
+            best = f">{'+' * counter}[<{_to_bf(step)}>-]<{_to_bf(rest)}"
+    return best
+
+
+def _signed(value: int, limit: int) -> int:
+    """Get the difference with the smallest magnitude that is equal to ``value`` modulo ``limit``."""
+    value %= limit
+    return value - limit if value > limit // 2 else value
+
+
+def _bank_centers(numbers: List[int], count: int, limit: int) -> List[int]:
+    """Split the character values into ``count`` groups of about the same amount of characters, and get the median of
+    each group."""
+    histogram = sorted(Counter(number % limit for number in numbers).items())
+    centers = []
+    total = len(numbers)
+    seen = 0
+    group = 0
+    for value, amount in histogram:
+        # The median of a group is the value that crosses the middle of its share of the characters
+        while group < count and seen + amount > total * (2 * group + 1) / (2 * count):
+            centers.append(value)
+            group += 1
+        seen += amount
+    return sorted(set(centers))
+
+
+def _bank_setup(centers: List[int], limit: int) -> Tuple[str, List[int]]:
+    """Get the code that fills the bank cells to the right of the current cell with values near ``centers`` using a
+    single multiply loop, and the values the cells end up with."""
+    targets = [_signed(center, limit) for center in centers]
+    best: Tuple[int, str, List[int]] = (0, "", [0] * len(targets))
+    for multiplier in range(1, 33):
+        factors = [(target + multiplier // 2) // multiplier for target in targets]
+        # The cost of the loop, plus the cost of adjusting each cell to its center later on
+        cost = multiplier + sum(
+            abs(factor) + abs(target - factor * multiplier) + 1
+            for factor, target in zip(factors, targets)
+        )
+        if not best[1] or cost < best[0]:
+            code = (
+                "+" * multiplier
+                + "["
+                + "".join(">" + _to_bf(factor) for factor in factors)
+                + "<" * len(factors)
+                + "-]"
+            )
+            best = (cost, code, [factor * multiplier % limit for factor in factors])
+    return best[1], best[2]
+
+
+def _encode_chunk(
+    value: str,
+    array_size: int,
+    int_size: IntegerSize,
+    strategy: EncodingStrategy,
+    reuse: bool,
+) -> Tuple[str, int]:
+    """Encode one chunk of a text in a worker process, see :meth:`EncodedBrainfuck._encode`."""
+    encoder = EncodedBrainfuck(array_size=array_size, int_size=int_size)
+    return encoder._encode(value, strategy, reuse)  # pylint: disable=protected-access
+
+
 class EncodedBrainfuck(BrainfuckBase, HasSizes):
     """An object to represent text encoded into Brainfuck.
 
@@ -26,7 +156,13 @@ class EncodedBrainfuck(BrainfuckBase, HasSizes):
         BrainfuckBase.__init__(self)
         HasSizes.__init__(self, array_size=array_size, int_size=int_size)
 
-    def parse(self, value: str) -> None:
+    def parse(
+        self,
+        value: str,
+        strategy: EncodingStrategy = "absolute",
+        workers: Optional[int] = None,
+        chunk_size: int = 65536,
+    ) -> None:
         """Parse the given text.
 
         .. note::
@@ -46,26 +182,140 @@ class EncodedBrainfuck(BrainfuckBase, HasSizes):
         ----------
         value: str
             The text to parse.
+        strategy: EncodingStrategy
+            How to encode the characters. ``"absolute"`` builds every character from zero in a new cell, or clears
+            the cell and reuses it if the text has too many characters to give each one its own cell. ``"delta"``
+            keeps the previous character in its cell and, for every character, uses whichever is shorter: changing
+            that cell by the difference, or building the character from zero in a new cell. ``"bank"`` first fills a
+            few cells with values near the most common characters, chosen from a histogram of the text, with a single
+            multiply loop. Every character is then printed from the cell that is cheapest to move to and adjust, which
+            keeps that character. This is usually the shortest for long texts.
+        workers: Optional[int]
+            The amount of processes to encode the text with. If this is more than ``1`` and the text is longer than
+            ``chunk_size``, the text is split into chunks of ``chunk_size`` characters, which are encoded in a process
+            pool and joined together. Each chunk starts on a new cell, so ``"delta"`` and ``"bank"`` may produce
+            slightly longer code than when encoding the text at once. If ``None``, the text is encoded in this process.
+        chunk_size: int
+            The amount of characters in each chunk when using ``workers``.
+
+        Raises
+        ------
+        ValueError
+            If ``strategy`` is not a valid :data:`EncodingStrategy`.
         """
-        self.result = ""
-        for character in value:
-            num = ord(character)
-            added = 0
-            # Use a walrus operator here when we drop support for Python 3.7
-            factored = factor_optimized(num + added, 8)
-            while len(factored) < 2:  # Does this cause an error for prime numbers?
-                added += 1
-                factored = factor_optimized(num + added, 8)
-
-            def to_bf(val: int) -> str:
-                return ("+" if val > 0 else "-") * abs(val)
-
-            self.result += (
-                ">" * (len(factored) - 1)
-                + to_bf(factored[0])
-                + "".join(f"[<{to_bf(val)}" for i, val in enumerate(factored[1:]))
-                + ">-]" * (len(factored) - 1)
-                + "<" * (len(factored) - 1)
-                + to_bf(-added)
-                + ".>"
+        if strategy not in ENCODING_STRATEGIES:
+            raise ValueError(
+                f"Unknown encoding strategy {strategy!r}, expected one of {', '.join(map(repr, ENCODING_STRATEGIES))}."
+            )
+        # Building a character uses at most one cell to its right per bit, so this is when the tape would wrap around
+        reuse = len(value) + self.int_size > self.array_size
+        if workers is None or workers < 2 or len(value) <= chunk_size:
+            self.result = self._encode(value, strategy, reuse)[0]
+            return
+        chunks = [value[i : i + chunk_size] for i in range(0, len(value), chunk_size)]
+        with ProcessPoolExecutor(workers) as executor:
+            results = executor.map(
+                _encode_chunk,
+                chunks,
+                [self.array_size] * len(chunks),
+                [self.int_size] * len(chunks),
+                [strategy] * len(chunks),
+                [reuse] * len(chunks),
             )
+            pieces = []
+            for code, gap in results:
+                # Move to a cell that is zero like every cell after it, which is where the next chunk expects to start
+                pieces.append(code + ">" * gap)
+        self.result = "".join(pieces)
+
+    def _encode(
+        self, value: str, strategy: EncodingStrategy, reuse: bool = False
+    ) -> Tuple[str, int]:
+        """Encode a text, returning the code and the amount of cells to move right after it to reach a cell where
+        every cell from it onwards is zero. With ``reuse``, ``"absolute"`` clears the cell of every character instead
+        of moving to a new one, so the tape never wraps around onto cells that are not zero.
+        """
+        table = _encoding_table(self.int_size)
+        numbers = list(map(ord, value))
+        local: Dict[int, str] = {}
+        for number in set(numbers).difference(table):
+            code = _encode_value(number, self.int_size)
+            if number < _SHARED_VALUES:
+                table[number] = code
+            else:
+                local[number] = code
+        if local:
+            table = {**table, **local}
+        if strategy == "absolute":
+            if reuse:
+                # The code in the table ends by moving to a new cell, and the cells it used to the right are zero again
+                table = {number: table[number][:-1] + "[-]" for number in set(numbers)}
+            return "".join(map(table.__getitem__, numbers)), 0
+        if strategy == "delta":
+            return self._encode_delta(numbers, table)
+        return self._encode_bank(numbers)
+
+    def _encode_delta(
+        self, numbers: List[int], table: Dict[int, str]
+    ) -> Tuple[str, int]:
+        limit = 2**self.int_size
+        pieces: List[str] = []
+        # The value of the cell the pointer is on. Every cell to its right is zero.
+        current = 0
+        for number in numbers:
+            difference = (number - current) % limit
+            if difference > limit // 2:
+                difference -= limit
+            delta = _delta_code(difference)
+            # The code in the table ends by moving to a new cell, which is not needed here
+            absolute = table[number][:-1]
+            if current:
+                absolute = ">" + absolute
+            pieces.append(absolute if len(absolute) < len(delta) + 1 else delta + ".")
+            current = number % limit
+        return "".join(pieces), 1 if current else 0
+
+    def _encode_bank(self, numbers: List[int]) -> Tuple[str, int]:
+        if not numbers:
+            return "", 0
+        limit = 2**self.int_size
+        # Choose the amount of bank cells by encoding the start of the text with every amount
+        sample = numbers[:4096]
+        best = ("", 0)
+        best_centers: List[int] = []
+        for count in range(1, 9):
+            centers = _bank_centers(sample, count, limit)
+            encoded = self._emit_bank(sample, centers)
+            if not best[0] or len(encoded[0]) < len(best[0]):
+                best = encoded
+                best_centers = centers
+            if len(centers) < count:
+                # There are not enough different characters to fill more cells
+                break
+        if len(sample) == len(numbers):
+            return best
+        return self._emit_bank(numbers, best_centers)
+
+    def _emit_bank(self, numbers: List[int], centers: List[int]) -> Tuple[str, int]:
+        limit = 2**self.int_size
+        setup, bank = _bank_setup(centers, limit)
+        pieces = [setup]
+        # The loop counter is cell 0, and the bank is in the cells after it
+        position = 0
+        for number in numbers:
+            best_cost = -1
+            best_cell = 0
+            best_difference = 0
+            for cell, value in enumerate(bank, 1):
+                difference = _signed(number - value, limit)
+                cost = abs(cell - position) + abs(difference)
+                if best_cost < 0 or cost < best_cost:
+                    best_cost = cost
+                    best_cell = cell
+                    best_difference = difference
+            move = best_cell - position
+            pieces.append((">" if move > 0 else "<") * abs(move))
+            pieces.append(_to_bf(best_difference) + ".")
+            bank[best_cell - 1] = number % limit
+            position = best_cell
+        return "".join(pieces), len(bank) + 1 - position
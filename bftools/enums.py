@@ -1,7 +1,8 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 __all__ = (
     "Code",
+    "OpCode",
     "Symbol",
 )
 
@@ -17,6 +18,9 @@ class Code(Enum):
     ENDLOOP = ""
     INPUT = "get_input()"
     OUTPUT = "output()"
+    SET = "set_value({0})"
+    SCAN = "scan({0})"
+    MULTIPLY = "multiply({1}, {0})"
 
 
 class Symbol(Enum):
@@ -35,3 +39,17 @@ class Symbol(Enum):
     @classmethod
     def _missing_(cls, value: object) -> "Symbol":
         return cls.UNKNOWN
+
+
+class OpCode(IntEnum):
+    """Enum for the instructions of a :class:`.Program`."""
+
+    ADD = 0
+    MOVE = 1
+    OPEN = 2
+    CLOSE = 3
+    INPUT = 4
+    OUTPUT = 5
+    SET = 6
+    SCAN = 7
+    MULTIPLY = 8
@@ -12,3 +12,61 @@ class NotParsedException(BfException):
     """Exception raised when the input data has not been parsed yet."""
 
     ...
+
+
+class UnbalancedBracketsException(BfException):
+    """Exception raised when the brackets of a brainfuck program do not match up."""
+
+    ...
+
+
+class BudgetExceededException(BfException):
+    """Exception raised when a brainfuck program exceeds one of the limits it was decoded with.
+
+    Parameters
+    ----------
+    limit: str
+        The name of the limit that was exceeded: ``"max_steps"``, ``"max_output"`` or ``"deadline"``.
+    output: str
+        The text the program had output before it was stopped.
+    steps: int
+        The amount of loop iterations the program had run before it was stopped.
+
+    Attributes
+    ----------
+    limit: str
+        The name of the limit that was exceeded.
+    output: str
+        The text the program had output before it was stopped.
+    steps: int
+        The amount of loop iterations the program had run before it was stopped.
+    """
+
+    def __init__(self, limit: str, output: str, steps: int) -> None:
+        super().__init__(
+            f"The program exceeded its {limit} limit after {steps} loop iterations."
+        )
+        self.limit = limit
+        self.output = output
+        self.steps = steps
+
+
+class NativeCompilerException(BfException):
+    """Exception raised when brainfuck code can not be compiled with the C compiler of the native engine.
+
+    Parameters
+    ----------
+    message: str
+        What went wrong.
+    stderr: str
+        What the C compiler wrote to its standard error, or ``""`` if it was not run.
+
+    Attributes
+    ----------
+    stderr: str
+        What the C compiler wrote to its standard error.
+    """
+
+    def __init__(self, message: str, stderr: str = "") -> None:
+        super().__init__(f"{message}\n{stderr}" if stderr else message)
+        self.stderr = stderr
@@ -0,0 +1,278 @@
+import sys
+import time
+from typing import Callable, Generator, List, Optional, Union
+
+from .base import HasSizes, IntegerSize
+from .buffers import InputBuffer, OutputBuffer
+from .enums import OpCode
+from .ir import Program, parse_program
+from .optimizer import optimize_program
+from .profiler import Profile
+
+__all__ = ("BrainfuckInterpreter",)
+
+_ADD = OpCode.ADD.value
+_MOVE = OpCode.MOVE.value
+_OPEN = OpCode.OPEN.value
+_CLOSE = OpCode.CLOSE.value
+_INPUT = OpCode.INPUT.value
+_OUTPUT = OpCode.OUTPUT.value
+_SET = OpCode.SET.value
+_SCAN = OpCode.SCAN.value
+_MULTIPLY = OpCode.MULTIPLY.value
+
+
+class BrainfuckInterpreter(HasSizes):
+    """Executes brainfuck code directly, without generating python code.
+
+    The code is parsed once into a :class:`Program`, whose instructions are then executed in a single loop.
+    Unlike :meth:`DecodedBrainfuck.parse`, this does not use :func:`exec`.
+
+    .. note::
+        This is meant to be used internally and you should not need to use it. Use :func:`decode_bf` with
+        ``engine="interpreter"`` instead.
+    """
+
+    def __init__(self, array_size: int = 30000, int_size: IntegerSize = 8) -> None:
+        super().__init__(array_size=array_size, int_size=int_size)
+
+    def run(
+        self,
+        code: Union[str, Program],
+        optimize: bool = True,
+        output: Optional[OutputBuffer] = None,
+        stdin: Optional[InputBuffer] = None,
+    ) -> str:
+        """Run the given brainfuck code and return its output.
+
+        Parameters
+        ----------
+        code: Union[str, Program]
+            The brainfuck code to run, or a program that has already been parsed.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` before running it. This is ignored if a
+            program is given.
+        output: Optional[OutputBuffer]
+            The buffer to write the output to. If ``None``, a new one is created.
+        stdin: Optional[InputBuffer]
+            The buffer to read the input from. If ``None``, the input is read from :data:`sys.stdin`.
+
+        Returns
+        -------
+        str
+            The output of the code, converted to text with :meth:`OutputBuffer.text`.
+
+        Raises
+        ------
+        UnbalancedBracketsException
+            If the brackets in the code do not match up.
+        ValueError
+            If the program contains an unknown instruction.
+        """
+        if output is None:
+            output = OutputBuffer(self.int_size)
+        for _ in self.execute(code, output, optimize=optimize, stdin=stdin):
+            pass
+        return output.text()
+
+    def execute(
+        self,
+        code: Union[str, Program],
+        output: OutputBuffer,
+        optimize: bool = True,
+        chunk_size: int = sys.maxsize,
+        stdin: Optional[InputBuffer] = None,
+        ticks: int = -1,
+        profile: Optional[Profile] = None,
+    ) -> Generator[int, Optional[int], None]:
+        """Run the given brainfuck code, pausing whenever enough output has been written.
+
+        This is a generator, which yields every time ``output`` holds at least ``chunk_size`` values, every time it has
+        run ``ticks`` loop iterations, and once more when the code has finished. The caller is expected to empty
+        ``output`` before resuming it, for example with :meth:`OutputBuffer.drain`. Like code generated with
+        ``interruptible=True`` by :meth:`CompiledBrainfuck.parse`, it yields the amount of loop iterations it has left,
+        and it can be resumed with :meth:`generator.send` and a new amount, or ``None`` to keep the current amount.
+
+        Parameters
+        ----------
+        code: Union[str, Program]
+            The brainfuck code to run, or a program that has already been parsed.
+        output: OutputBuffer
+            The buffer to write the output to.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` before running it. This is ignored if a
+            program is given.
+        chunk_size: int
+            The amount of values after which to pause.
+        stdin: Optional[InputBuffer]
+            The buffer to read the input from. If ``None``, the input is read from :data:`sys.stdin`.
+        ticks: int
+            The amount of loop iterations after which to pause. If this is negative, it never pauses for this. Every
+            step of an :attr:`OpCode.SCAN` counts as an iteration.
+        profile: Optional[Profile]
+            The profile to count the instructions that run in. Its :attr:`Profile.program` is run instead of
+            ``code``. This makes the code several times slower.
+
+        Yields
+        ------
+        int
+            The amount of loop iterations left before pausing. The output is in ``output``.
+
+        Raises
+        ------
+        UnbalancedBracketsException
+            If the brackets in the code do not match up.
+        ValueError
+            If the program contains an unknown instruction.
+        """
+        if profile is not None:
+            program = profile.program
+        elif isinstance(code, str):
+            program = parse_program(code)
+            if optimize:
+                program = optimize_program(program, self.int_size)
+        else:
+            program = code
+        read = (stdin if stdin is not None else InputBuffer()).read
+        if profile is not None:
+            yield from self._profile(profile, output, chunk_size, read, ticks)
+            return
+        # Lists are faster to index than arrays, since arrays need to box every value they return.
+        ops = program.ops.tolist()
+        args = program.args.tolist()
+        offsets = program.offsets.tolist()
+        length = len(ops)
+        size = self.array_size
+        mask = 2**self.int_size - 1
+        tape = [0] * size
+        buffer = output.buffer
+        write = output.write
+        position = 0
+        index = 0
+        while index < length:
+            instruction = ops[index]
+            if instruction == _ADD:
+                tape[position] = (tape[position] + args[index]) & mask
+            elif instruction == _MOVE:
+                position = (position + args[index]) % size
+            elif instruction == _OPEN:
+                if not tape[position]:
+                    index = args[index]
+            elif instruction == _CLOSE:
+                # Count every iteration, like the generated code, even if the loop ends
+                ticks -= 1
+                if not ticks:
+                    sent = yield ticks
+                    if sent is not None:
+                        ticks = sent
+                if tape[position]:
+                    index = args[index]
+            elif instruction == _MULTIPLY:
+                target = (position + offsets[index]) % size
+                tape[target] = (tape[target] + tape[position] * args[index]) & mask
+            elif instruction == _SET:
+                tape[position] = args[index] & mask
+            elif instruction == _SCAN:
+                step = args[index]
+                while tape[position]:
+                    position = (position + step) % size
+                    # Every step replaces an iteration of a loop, so a scan that never finds a zero cell still pauses
+                    ticks -= 1
+                    if not ticks:
+                        sent = yield ticks
+                        if sent is not None:
+                            ticks = sent
+            elif instruction == _OUTPUT:
+                write(tape[position])
+                if len(buffer) >= chunk_size:
+                    sent = yield ticks
+                    if sent is not None:
+                        ticks = sent
+            elif instruction == _INPUT:
+                tape[position] = read(tape[position]) & mask
+            else:
+                raise ValueError(f"Unknown instruction {instruction} at index {index}.")
+            index += 1
+        yield ticks
+
+    def _profile(
+        self,
+        profile: Profile,
+        output: OutputBuffer,
+        chunk_size: int,
+        read: Callable[[int], int],
+        ticks: int,
+    ) -> Generator[int, Optional[int], None]:
+        """Run a program like :meth:`execute`, counting every instruction in ``profile``."""
+        program = profile.program
+        ops = program.ops.tolist()
+        args = program.args.tolist()
+        offsets = program.offsets.tolist()
+        counts = profile.counts
+        times = profile.times
+        clock = time.perf_counter
+        # The time at which each loop that is running was entered
+        starts: List[float] = []
+        length = len(ops)
+        size = self.array_size
+        mask = 2**self.int_size - 1
+        tape = [0] * size
+        buffer = output.buffer
+        write = output.write
+        position = 0
+        index = 0
+        begin = clock()
+        # Keep the time of a program that is stopped early, for example by a limit
+        try:
+            while index < length:
+                counts[index] += 1
+                instruction = ops[index]
+                if instruction == _ADD:
+                    tape[position] = (tape[position] + args[index]) & mask
+                elif instruction == _MOVE:
+                    position = (position + args[index]) % size
+                elif instruction == _OPEN:
+                    if tape[position]:
+                        starts.append(clock())
+                    else:
+                        index = args[index]
+                elif instruction == _CLOSE:
+                    ticks -= 1
+                    if not ticks:
+                        sent = yield ticks
+                        if sent is not None:
+                            ticks = sent
+                    if tape[position]:
+                        index = args[index]
+                    else:
+                        times[args[index]] += clock() - starts.pop()
+                elif instruction == _MULTIPLY:
+                    target = (position + offsets[index]) % size
+                    tape[target] = (tape[target] + tape[position] * args[index]) & mask
+                elif instruction == _SET:
+                    tape[position] = args[index] & mask
+                elif instruction == _SCAN:
+                    step = args[index]
+                    while tape[position]:
+                        position = (position + step) % size
+                        ticks -= 1
+                        if not ticks:
+                            sent = yield ticks
+                            if sent is not None:
+                                ticks = sent
+                elif instruction == _OUTPUT:
+                    write(tape[position])
+                    if len(buffer) >= chunk_size:
+                        sent = yield ticks
+                        if sent is not None:
+                            ticks = sent
+                elif instruction == _INPUT:
+                    tape[position] = read(tape[position]) & mask
+                else:
+                    raise ValueError(
+                        f"Unknown instruction {instruction} at index {index}."
+                    )
+                index += 1
+            yield ticks
+        finally:
+            profile.time = clock() - begin
@@ -0,0 +1,295 @@
+import re
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .enums import OpCode, Symbol
+from .exceptions import UnbalancedBracketsException
+
+__all__ = (
+    "Program",
+    "StreamItem",
+    "parse_program",
+    "parse_stream",
+    "tokenize",
+)
+
+_ADD = OpCode.ADD.value
+_MOVE = OpCode.MOVE.value
+_OPEN = OpCode.OPEN.value
+_CLOSE = OpCode.CLOSE.value
+
+StreamItem = Union[Tuple[int, int, int], str]
+"""An item of a stream of instructions from :func:`parse_stream`.
+
+This is either an instruction, as an ``(opcode, operand, offset)`` tuple like in :class:`Program`, or the text of a
+comment.
+"""
+
+_OPS = {
+    "+": _ADD,
+    "-": _ADD,
+    ">": _MOVE,
+    "<": _MOVE,
+    "[": _OPEN,
+    "]": _CLOSE,
+    ",": OpCode.INPUT.value,
+    ".": OpCode.OUTPUT.value,
+}
+
+# Every match is either a run of additions, a run of moves, a single other instruction or a whole comment, so the
+# parsers only run python code once per token instead of once per character.
+_TOKENS = re.compile(r"[+-]+|[<>]+|[\[\],.]|[^+\-<>\[\],.]+")
+_COMMENTS = re.compile(r"[^+\-<>\[\],.]+")
+
+_SYMBOLS = tuple(Symbol)
+# Maps every byte to the index of its symbol in _SYMBOLS, so a whole source is classified by a single bytes.translate
+_SYMBOL_TABLE = bytes(
+    _SYMBOLS.index(Symbol(chr(byte))) if byte < 128 else _SYMBOLS.index(Symbol.UNKNOWN)
+    for byte in range(256)
+)
+
+
+def _amount(token: str, positive: str) -> int:
+    """Get the net amount of a run of additions or moves."""
+    return 2 * token.count(positive) - len(token)
+
+
+def tokenize(code: str) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """Classify every character of brainfuck code at once.
+
+    Parameters
+    ----------
+    code: str
+        The brainfuck code to classify.
+
+    Returns
+    -------
+    Tuple[bytes, List[Tuple[int, int]]]
+        The symbols and the comments. The symbols contain one byte for each character of the code, which is the index
+        of its :class:`Symbol` in the order the symbols are defined. The comments are the ``(start, end)`` spans of
+        each run of characters that are not brainfuck instructions.
+    """
+    # Every character that is not ascii becomes a single "?", so the symbols still line up with the characters
+    symbols = code.encode("ascii", "replace").translate(_SYMBOL_TABLE)
+    return symbols, [match.span() for match in _COMMENTS.finditer(code)]
+
+
+class Program:
+    """The intermediate representation of brainfuck code, shared by the compiler, the interpreter and any other tool
+    that needs to understand the code.
+
+    Runs of ``+``/``-`` and ``<``/``>`` are folded into a single :attr:`OpCode.ADD` or :attr:`OpCode.MOVE`
+    instruction, whose operand is the net amount to add or move by. The operand of :attr:`OpCode.OPEN` and
+    :attr:`OpCode.CLOSE` is the index of the matching bracket.
+
+    Programs returned by :func:`optimize_program` may also contain these instructions:
+
+    - :attr:`OpCode.SET` sets the current cell to its operand.
+    - :attr:`OpCode.SCAN` moves the pointer by its operand until it reaches a zero cell.
+    - :attr:`OpCode.MULTIPLY` adds the current cell, multiplied by its operand, to the cell at its offset from the
+      pointer.
+
+    .. note::
+        This is meant to be used internally and you should not need to use it. Use :func:`parse_program` to create
+        one.
+
+    Attributes
+    ----------
+    source: str
+        The code this program was parsed from.
+    ops: array
+        The :class:`OpCode` of each instruction.
+    args: array
+        The operand of each instruction.
+    offsets: array
+        The offset from the pointer of the cell each instruction works on. This is only used by
+        :attr:`OpCode.MULTIPLY`, and is ``0`` for every other instruction.
+    positions: array
+        The index in :attr:`source` at which each instruction starts.
+    comments: List[Tuple[int, int, int]]
+        The comments in :attr:`source`, as ``(index, start, end)`` tuples. ``index`` is the index of the instruction
+        the comment precedes, and ``start`` and ``end`` are the span of the comment in :attr:`source`.
+    """
+
+    __slots__ = ("source", "ops", "args", "offsets", "positions", "comments")
+
+    def __init__(
+        self,
+        source: str = "",
+        ops: Optional["array[int]"] = None,
+        args: Optional["array[int]"] = None,
+        offsets: Optional["array[int]"] = None,
+        positions: Optional["array[int]"] = None,
+        comments: Optional[List[Tuple[int, int, int]]] = None,
+    ) -> None:
+        self.source = source
+        self.ops = ops if ops is not None else array("B")
+        self.args = args if args is not None else array("q")
+        self.offsets = offsets if offsets is not None else array("q")
+        self.positions = positions if positions is not None else array("q")
+        self.comments = comments if comments is not None else []
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def __iter__(self) -> Iterator[Tuple[OpCode, int]]:
+        """Iterate over the instructions as ``(opcode, operand)`` tuples."""
+        for op, arg in zip(self.ops, self.args):
+            yield OpCode(op), arg
+
+    def comment(self, index: int) -> str:
+        """Get the text of a comment.
+
+        Parameters
+        ----------
+        index: int
+            The index of the comment in :attr:`comments`.
+
+        Returns
+        -------
+        str
+            The text of the comment.
+        """
+        _, start, end = self.comments[index]
+        return self.source[start:end]
+
+
+def parse_program(code: str) -> Program:
+    """Parse brainfuck code into a :class:`Program` in a single pass.
+
+    Parameters
+    ----------
+    code: str
+        The brainfuck code to parse.
+
+    Returns
+    -------
+    Program
+        The parsed program.
+
+    Raises
+    ------
+    UnbalancedBracketsException
+        If the brackets in the code do not match up.
+    """
+    program = Program(code)
+    ops = program.ops
+    args = program.args
+    offsets = program.offsets
+    positions = program.positions
+    comments = program.comments
+    loops: List[int] = []
+    for match in _TOKENS.finditer(code):
+        token = match.group()
+        position = match.start()
+        op = _OPS.get(token[0])
+        if op is None:
+            comments.append((len(ops), position, match.end()))
+            continue
+        arg = 0
+        if op == _ADD:
+            arg = _amount(token, "+")
+        elif op == _MOVE:
+            arg = _amount(token, ">")
+        if op in (_ADD, _MOVE) and ops and ops[-1] == op:
+            args[-1] += arg
+            continue
+        if op == _OPEN:
+            loops.append(len(ops))
+        elif op == _CLOSE:
+            if not loops:
+                raise UnbalancedBracketsException(
+                    f"Unexpected ']' at position {position} without a matching '['."
+                )
+            start = loops.pop()
+            args[start] = len(ops)
+            arg = start
+        ops.append(op)
+        args.append(arg)
+        offsets.append(0)
+        positions.append(position)
+    if loops:
+        raise UnbalancedBracketsException(
+            f"Unexpected end of code, expected ']' to close '[' at position {positions[loops[-1]]}."
+        )
+    return program
+
+
+def parse_stream(chunks: Iterable[str]) -> Iterator[StreamItem]:
+    """Parse brainfuck code incrementally, one chunk at a time.
+
+    Unlike :func:`parse_program`, this never holds more than one chunk of the code, so it can parse code that does
+    not fit in memory. Runs of ``+``/``-`` and ``<``/``>`` are folded like in :class:`Program`, even across chunks
+    and comments. A comment in the middle of a run is held back and yielded after the run, which is where
+    :class:`Program` places it too. The operand of :attr:`OpCode.OPEN` and :attr:`OpCode.CLOSE` is always ``0``,
+    since the matching bracket is not known yet.
+
+    Parameters
+    ----------
+    chunks: Iterable[str]
+        The brainfuck code to parse, split into chunks of any size.
+
+    Yields
+    ------
+    StreamItem
+        The instructions and comments in the order they appear in the code. A comment that spans multiple chunks is
+        yielded in multiple parts.
+
+    Raises
+    ------
+    UnbalancedBracketsException
+        If the brackets in the code do not match up. This is only raised once the parser reaches the bracket, so
+        everything before it has already been yielded.
+    """
+    # The positions of the brackets that are still open
+    loops: List[int] = []
+    # The instruction that is being folded, which is only yielded once the run ends
+    run_op = -1
+    run_arg = 0
+    # The comments after the instruction that is being folded, which follow it once the run ends
+    held: List[str] = []
+    offset = 0
+    for chunk in chunks:
+        for match in _TOKENS.finditer(chunk):
+            token = match.group()
+            op = _OPS.get(token[0])
+            if op is None:
+                if run_op >= 0:
+                    held.append(token)
+                else:
+                    yield token
+                continue
+            if op in (_ADD, _MOVE):
+                arg = _amount(token, "+" if op == _ADD else ">")
+                if op == run_op:
+                    run_arg += arg
+                    continue
+                if run_op >= 0:
+                    yield run_op, run_arg, 0
+                    yield from held
+                    held.clear()
+                run_op = op
+                run_arg = arg
+                continue
+            if run_op >= 0:
+                yield run_op, run_arg, 0
+                yield from held
+                held.clear()
+                run_op = -1
+            if op == _OPEN:
+                loops.append(offset + match.start())
+            elif op == _CLOSE:
+                if not loops:
+                    raise UnbalancedBracketsException(
+                        f"Unexpected ']' at position {offset + match.start()} without a matching '['."
+                    )
+                loops.pop()
+            yield op, 0, 0
+        offset += len(chunk)
+    if run_op >= 0:
+        yield run_op, run_arg, 0
+        yield from held
+    if loops:
+        raise UnbalancedBracketsException(
+            f"Unexpected end of code, expected ']' to close '[' at position {loops[-1]}."
+        )
@@ -0,0 +1,404 @@
+import ctypes
+import hashlib
+import os
+import platform
+import shutil
+import subprocess  # nosec B404
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Generator, List, Optional, Union
+
+from .base import HasSizes, IntegerSize
+from .buffers import InputBuffer, OutputBuffer
+from .cache import DiskCache
+from .enums import OpCode
+from .exceptions import NativeCompilerException
+from .ir import Program, parse_program
+from .optimizer import optimize_program
+
+__all__ = ("NativeBrainfuck",)
+
+_ADD = OpCode.ADD.value
+_MOVE = OpCode.MOVE.value
+_OPEN = OpCode.OPEN.value
+_CLOSE = OpCode.CLOSE.value
+_INPUT = OpCode.INPUT.value
+_OUTPUT = OpCode.OUTPUT.value
+_SET = OpCode.SET.value
+_SCAN = OpCode.SCAN.value
+_MULTIPLY = OpCode.MULTIPLY.value
+
+# What the generated function returns when it stops
+_FINISHED = 0
+_OUTPUT_FULL = 1
+_OUT_OF_TICKS = 2
+_NEEDS_INPUT = 3
+
+# The amount of values the generated function can output before it has to return them
+_OUTPUT_SIZE = 65536
+
+_FLAGS = ("-shared", "-fPIC")
+
+# The size of the C code above which it is compiled with -O1 instead of -O2, since -O2 takes minutes for large code
+_LARGE_SOURCE = 100000
+
+_CELL_TYPES = {
+    8: ctypes.c_uint8,
+    16: ctypes.c_uint16,
+    32: ctypes.c_uint32,
+    64: ctypes.c_uint64,
+}
+
+# The state shared with the generated function: where to resume, the pointer, the loop iterations left before
+# pausing, the amount of values in the output and the amount of values after which to pause.
+_HEADER = """#include <stdint.h>
+#ifdef _WIN32
+#define EXPORT __declspec(dllexport)
+#else
+#define EXPORT
+#endif
+#define SAVE(label) do {{ state[0] = label; state[1] = p; state[2] = ticks; state[3] = count; }} while (0)
+typedef uint{0}_t cell;
+
+EXPORT int64_t bf_run(int64_t *state, cell *tape, cell *out) {{
+    int64_t p = state[1], ticks = state[2], count = state[3], limit = state[4], t;
+    (void)t;
+    switch (state[0]) {{
+{1}
+    }}
+"""
+
+_FOOTER = """    SAVE(0);
+    return 0;
+}
+"""
+
+# The generated functions that have been loaded, by the digest of their library
+_LOADED: Dict[str, Callable[..., int]] = {}
+
+
+def _compiler() -> Optional[str]:
+    """Find the C compiler, which is ``$CC`` or ``cc``."""
+    return shutil.which(os.environ.get("CC") or "cc")
+
+
+def _default_directory() -> str:
+    """Get the directory libraries are stored in by default, which is only accessible by the current user."""
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache, "bftools", "native")
+
+
+class NativeBrainfuck(HasSizes):
+    """Executes brainfuck code by translating it into C and compiling it into a shared library with the system's C
+    compiler.
+
+    The library is loaded with :mod:`ctypes`, and stored in a directory under the hash of its source, so the same code
+    is only compiled once. Like :class:`BrainfuckInterpreter`, the generated code pauses to hand over its output and to
+    read its input, so it works with the same :class:`OutputBuffer` and :class:`InputBuffer`.
+
+    .. note::
+        This is meant to be used internally and you should not need to use it. Use :func:`decode_bf` with
+        ``engine="native"`` instead, which falls back to ``"compiler"`` if there is no C compiler.
+
+    Parameters
+    ----------
+    array_size: int
+        The size of the array.
+    int_size: IntegerSize
+        The amount of bits per integer.
+    directory: Optional[Union[str, os.PathLike]]
+        The directory to store the compiled libraries in. If ``None``, ``bftools/native`` in the user's cache
+        directory is used.
+    disk_cache: Optional[DiskCache]
+        The cache to store the compiled libraries in instead of ``directory``, in its
+        :attr:`DiskCache.library_directory`. They then count towards its maximum size and are removed by
+        :meth:`DiskCache.clear`.
+    """
+
+    def __init__(
+        self,
+        array_size: int = 30000,
+        int_size: IntegerSize = 8,
+        directory: Optional[Union[str, "os.PathLike[str]"]] = None,
+        disk_cache: Optional[DiskCache] = None,
+    ) -> None:
+        super().__init__(array_size=array_size, int_size=int_size)
+        self._disk_cache = disk_cache
+        if disk_cache is not None:
+            self._directory = disk_cache.library_directory
+        elif directory is not None:
+            self._directory = os.fspath(directory)
+        else:
+            self._directory = _default_directory()
+
+    @staticmethod
+    def available() -> bool:
+        """Check whether a C compiler is available.
+
+        The compiler is ``$CC`` if it is set, or ``cc`` otherwise.
+
+        Returns
+        -------
+        bool
+            Whether the compiler was found.
+        """
+        return _compiler() is not None
+
+    def translate(self, code: Union[str, Program], optimize: bool = True) -> str:
+        """Translate brainfuck code into C.
+
+        The code defines ``int64_t bf_run(int64_t *state, cell *tape, cell *out)``, which runs until the code
+        finishes, ``out`` is full, the loop iterations run out or the code needs input, and returns which of these
+        happened. It can then be called again to resume the code.
+
+        Parameters
+        ----------
+        code: Union[str, Program]
+            The brainfuck code to translate, or a program that has already been parsed.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` before translating it. This is ignored if a
+            program is given.
+
+        Returns
+        -------
+        str
+            The C code.
+
+        Raises
+        ------
+        UnbalancedBracketsException
+            If the brackets in the code do not match up.
+        ValueError
+            If the program contains an unknown instruction.
+        """
+        if isinstance(code, str):
+            program = parse_program(code)
+            if optimize:
+                program = optimize_program(program, self.int_size)
+        else:
+            program = code
+        size = self.array_size
+        modulus = 2**self.int_size
+        lines: List[str] = []
+        labels = 0
+
+        def resume(status: int) -> str:
+            nonlocal labels
+            labels += 1
+            return f"{{ SAVE({labels}); return {status}; r{labels}: ; }}"
+
+        def move(variable: str, amount: int) -> str:
+            # The amount is never negative, so the pointer only needs to wrap around the end of the tape
+            return f"{variable} += {amount}; if ({variable} >= {size}) {variable} -= {size};"
+
+        for index, (op, arg, offset) in enumerate(
+            zip(program.ops, program.args, program.offsets)
+        ):
+            if op == _ADD:
+                lines.append(f"tape[p] = (cell)(tape[p] + {arg % modulus}ULL);")
+            elif op == _MOVE:
+                if arg % size:
+                    lines.append(move("p", arg % size))
+            elif op == _OPEN:
+                lines.append(f"if (!tape[p]) goto e{index}; b{index}: ;")
+            elif op == _CLOSE:
+                lines.append(f"if (--ticks == 0) {resume(_OUT_OF_TICKS)}")
+                lines.append(f"if (tape[p]) goto b{arg}; e{arg}: ;")
+            elif op == _OUTPUT:
+                lines.append(
+                    f"out[count++] = tape[p]; if (count >= limit) {resume(_OUTPUT_FULL)}"
+                )
+            elif op == _INPUT:
+                lines.append(resume(_NEEDS_INPUT))
+            elif op == _SET:
+                lines.append(f"tape[p] = (cell){arg % modulus}ULL;")
+            elif op == _SCAN:
+                # Every step replaces an iteration of a loop, so it is counted like one
+                lines.append(
+                    f"while (tape[p]) {{ {move('p', arg % size)} "
+                    f"if (--ticks == 0) {resume(_OUT_OF_TICKS)} }}"
+                )
+            elif op == _MULTIPLY:
+                lines.append(
+                    f"t = p; {move('t', offset % size)} "
+                    f"tape[t] = (cell)(tape[t] + (uint64_t)tape[p] * {arg % modulus}ULL);"
+                )
+            else:
+                raise ValueError(f"Unknown instruction {op} at index {index}.")
+        cases = "\n".join(
+            f"    case {label}: goto r{label};" for label in range(1, labels + 1)
+        )
+        body = "".join(f"    {line}\n" for line in lines)
+        return _HEADER.format(self.int_size, cases) + body + _FOOTER
+
+    def _load(self, source: str) -> Callable[..., int]:
+        """Compile C code from :meth:`translate` into a library, or reuse the library it was compiled into before, and
+        load its function."""
+        compiler = _compiler()
+        if compiler is None:
+            raise NativeCompilerException("No C compiler was found.")
+        flags = ("-O1" if len(source) > _LARGE_SOURCE else "-O2", *_FLAGS)
+        digest = hashlib.sha256(source.encode())
+        digest.update(
+            f"\0{compiler}\0{flags}\0{sys.platform}\0{platform.machine()}".encode()
+        )
+        key = digest.hexdigest()
+        function = _LOADED.get(key)
+        if function is not None:
+            return function
+        suffix = ".dll" if sys.platform == "win32" else ".so"
+        path = os.path.join(self._directory, key + suffix)
+        compiled = not os.path.exists(path)
+        if compiled:
+            # Only the current user may write libraries that are loaded into this process
+            os.makedirs(self._directory, mode=0o700, exist_ok=True)
+            scratch = tempfile.mkdtemp(dir=self._directory)
+            try:
+                with open(os.path.join(scratch, "bf.c"), "w", encoding="utf-8") as file:
+                    file.write(source)
+                process = subprocess.run(  # nosec B603
+                    [compiler, *flags, "-o", os.path.join(scratch, "bf" + suffix)]
+                    + [os.path.join(scratch, "bf.c")],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    check=False,
+                )
+                if process.returncode:
+                    raise NativeCompilerException(
+                        f"{compiler} exited with code {process.returncode}.",
+                        process.stderr.decode(errors="replace"),
+                    )
+                os.replace(os.path.join(scratch, "bf" + suffix), path)
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+        else:
+            try:
+                # Mark the library as recently used, so it is pruned last
+                os.utime(path)
+            except OSError:  # pragma: no cover
+                pass
+        function = ctypes.CDLL(path).bf_run
+        function.argtypes = (
+            ctypes.POINTER(ctypes.c_int64),
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+        )
+        function.restype = ctypes.c_int64
+        _LOADED[key] = function
+        if compiled and self._disk_cache is not None:
+            # The library is loaded first, since this may remove it again if the cache is too small
+            self._disk_cache.track(os.path.getsize(path))
+        return function
+
+    def run(
+        self,
+        code: Union[str, Program],
+        optimize: bool = True,
+        output: Optional[OutputBuffer] = None,
+        stdin: Optional[InputBuffer] = None,
+    ) -> str:
+        """Run the given brainfuck code and return its output, see :meth:`BrainfuckInterpreter.run`.
+
+        Parameters
+        ----------
+        code: Union[str, Program]
+            The brainfuck code to run, or a program that has already been parsed.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` before running it. This is ignored if a
+            program is given.
+        output: Optional[OutputBuffer]
+            The buffer to write the output to. If ``None``, a new one is created.
+        stdin: Optional[InputBuffer]
+            The buffer to read the input from. If ``None``, the input is read from :data:`sys.stdin`.
+
+        Returns
+        -------
+        str
+            The output of the code, converted to text with :meth:`OutputBuffer.text`.
+
+        Raises
+        ------
+        UnbalancedBracketsException
+            If the brackets in the code do not match up.
+        ValueError
+            If the program contains an unknown instruction.
+        NativeCompilerException
+            If there is no C compiler, or it fails to compile the code.
+        """
+        if output is None:
+            output = OutputBuffer(self.int_size)
+        for _ in self.execute(code, output, optimize=optimize, stdin=stdin):
+            pass
+        return output.text()
+
+    def execute(
+        self,
+        code: Union[str, Program],
+        output: OutputBuffer,
+        optimize: bool = True,
+        chunk_size: int = sys.maxsize,
+        stdin: Optional[InputBuffer] = None,
+        ticks: int = -1,
+    ) -> Generator[int, Optional[int], None]:
+        """Run the given brainfuck code, pausing whenever enough output has been written.
+
+        This works like :meth:`BrainfuckInterpreter.execute`, but the code is compiled before it starts to run.
+
+        Parameters
+        ----------
+        code: Union[str, Program]
+            The brainfuck code to run, or a program that has already been parsed.
+        output: OutputBuffer
+            The buffer to write the output to.
+        optimize: bool
+            Whether to optimize the code with :func:`optimize_program` before running it. This is ignored if a
+            program is given.
+        chunk_size: int
+            The amount of values after which to pause.
+        stdin: Optional[InputBuffer]
+            The buffer to read the input from. If ``None``, the input is read from :data:`sys.stdin`.
+        ticks: int
+            The amount of loop iterations after which to pause. If this is negative, it never pauses for this. Every
+            step of an :attr:`OpCode.SCAN` counts as an iteration. The code can not be interrupted in any other way
+            while it runs.
+
+        Yields
+        ------
+        int
+            The amount of loop iterations left before pausing. The output is in ``output``.
+
+        Raises
+        ------
+        UnbalancedBracketsException
+            If the brackets in the code do not match up.
+        ValueError
+            If the program contains an unknown instruction.
+        NativeCompilerException
+            If there is no C compiler, or it fails to compile the code.
+        """
+        function = self._load(self.translate(code, optimize=optimize))
+        cell: Any = _CELL_TYPES[self.int_size]
+        mask = 2**self.int_size - 1
+        state = (ctypes.c_int64 * 5)(0, 0, ticks, 0, 0)
+        tape = (cell * self.array_size)()
+        out = (cell * _OUTPUT_SIZE)()
+        buffer = output.buffer
+        read = (stdin if stdin is not None else InputBuffer()).read
+        while True:
+            # Return the output as soon as there is enough to pause for
+            state[4] = max(1, min(_OUTPUT_SIZE, chunk_size - len(buffer)))
+            status = function(state, tape, out)
+            if state[3]:
+                buffer.extend(out[: state[3]])
+                state[3] = 0
+            if status == _FINISHED:
+                break
+            if status == _NEEDS_INPUT:
+                tape[state[1]] = read(tape[state[1]]) & mask
+            elif status == _OUT_OF_TICKS or len(buffer) >= chunk_size:
+                sent = yield state[2]
+                if sent is not None:
+                    state[2] = sent
+        yield state[2]
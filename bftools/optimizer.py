@@ -0,0 +1,268 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .base import IntegerSize
+from .enums import OpCode
+from .ir import Program, StreamItem
+
+__all__ = (
+    "optimize_program",
+    "optimize_stream",
+)
+
+_ADD = OpCode.ADD.value
+_MOVE = OpCode.MOVE.value
+_OPEN = OpCode.OPEN.value
+_CLOSE = OpCode.CLOSE.value
+_INPUT = OpCode.INPUT.value
+_OUTPUT = OpCode.OUTPUT.value
+_SET = OpCode.SET.value
+_SCAN = OpCode.SCAN.value
+_MULTIPLY = OpCode.MULTIPLY.value
+
+
+def _analyze_loop(program: Program, start: int, end: int) -> Optional[Dict[int, int]]:
+    """Get the amount each cell changes by in one iteration of a loop, keyed by offset from the pointer.
+
+    Returns ``None`` if the loop contains anything other than additions and moves, or does not return the pointer to
+    where it started.
+    """
+    changes: Dict[int, int] = {}
+    offset = 0
+    for index in range(start + 1, end):
+        op = program.ops[index]
+        if op == _ADD:
+            changes[offset] = changes.get(offset, 0) + program.args[index]
+        elif op == _MOVE:
+            offset += program.args[index]
+        else:
+            return None
+    if offset != 0:
+        return None
+    return changes
+
+
+def _inverse(value: int, int_size: IntegerSize) -> int:
+    """Get the multiplicative inverse of an odd value modulo ``2**int_size``."""
+    modulus = 2**int_size
+    # Newton's method, every step doubles the amount of correct low bits. An odd value is its own inverse modulo 8,
+    # so 5 steps give the 96 bits needed for any integer size.
+    inverse = value
+    for _ in range(5):
+        inverse = inverse * (2 - value * inverse) % modulus
+    return inverse
+
+
+def _optimize_loop(
+    program: Program, start: int, end: int, int_size: Optional[IntegerSize] = None
+) -> Optional[List[List[int]]]:
+    """Get the instructions that can replace a loop, as ``[opcode, operand, offset]`` lists.
+
+    Returns ``None`` if the loop can not be replaced.
+    """
+    if end - start == 2 and program.ops[start + 1] == _MOVE:
+        # [>] or [<], move until a zero cell is found
+        step = program.args[start + 1]
+        return [[_SCAN, step, 0]] if step else None
+    changes = _analyze_loop(program, start, end)
+    if changes is None:
+        return None
+    counter = changes.pop(0, 0)
+    if counter in (1, -1):
+        # When the counter goes down by one, the loop runs once for every unit of the counter's value. When it goes up
+        # by one, it runs until it overflows, which is the same as running once for every unit of its negated value.
+        factor = -counter
+    elif int_size is not None and counter % 2:
+        # The loop runs n times, where value + n * counter = 0 modulo 2**int_size. An odd counter has an inverse, so
+        # n = value * -inverse(counter), which is the only such n below 2**int_size.
+        factor = -_inverse(counter % 2**int_size, int_size)
+    else:
+        # An even counter may skip zero and loop forever
+        return None
+    replacement = []
+    for offset, change in sorted(changes.items()):
+        amount = change * factor
+        if int_size is not None:
+            # Keep the operand signed and within the size of the cells, so it fits in the program even for 64 bits
+            half = 2 ** (int_size - 1)
+            amount = (amount + half) % (2 * half) - half
+        if amount:
+            replacement.append([_MULTIPLY, amount, offset])
+    replacement.append([_SET, 0, 0])
+    return replacement
+
+
+def optimize_program(
+    program: Program, int_size: Optional[IntegerSize] = None
+) -> Program:
+    """Optimize a :class:`Program` by replacing common brainfuck idioms with single instructions.
+
+    The following idioms are replaced:
+
+    - Clear loops, such as ``[-]`` and ``[+]``, become :attr:`OpCode.SET`. Any additions directly after the set are
+      merged into it.
+    - Scan loops, such as ``[>]`` and ``[<<]``, become :attr:`OpCode.SCAN`.
+    - Balanced multiply and copy loops, such as ``[->+>++<<]``, become one :attr:`OpCode.MULTIPLY` for each changed
+      cell, followed by :attr:`OpCode.SET`. With an ``int_size``, this includes loops whose counter changes by any
+      odd amount, such as ``[--->+<]``, which run a number of times that follows from the modular inverse of the
+      amount. Loops whose counter changes by an even amount are kept, since they may never end.
+
+    Additions and moves by zero, such as ``+-``, are removed.
+
+    Parameters
+    ----------
+    program: Program
+        The program to optimize. This is not modified.
+    int_size: Optional[IntegerSize]
+        The amount of bits per integer of the cells the program will run with. If ``None``, only loops whose counter
+        changes by one are replaced, which is correct for any size.
+
+    Returns
+    -------
+    Program
+        The optimized program.
+    """
+    optimized = Program(program.source)
+    ops = optimized.ops
+    args = optimized.args
+    offsets = optimized.offsets
+    positions = optimized.positions
+    # The index in the optimized program of each instruction of the original program, used to move the comments.
+    indexes = [0] * (len(program) + 1)
+    loops: List[int] = []
+    index = 0
+    while index < len(program):
+        indexes[index] = len(ops)
+        op = program.ops[index]
+        arg = program.args[index]
+        position = program.positions[index]
+        if op in (_ADD, _MOVE) and arg == 0:
+            index += 1
+            continue
+        if op == _ADD and ops and ops[-1] == _SET and offsets[-1] == 0:
+            args[-1] += arg
+            index += 1
+            continue
+        if op == _OPEN:
+            replacement = _optimize_loop(program, index, arg, int_size)
+            if replacement is not None:
+                for new_index in range(index + 1, arg + 1):
+                    indexes[new_index] = len(ops)
+                for new_op, new_arg, new_offset in replacement:
+                    ops.append(new_op)
+                    args.append(new_arg)
+                    offsets.append(new_offset)
+                    positions.append(position)
+                index = arg + 1
+                continue
+            loops.append(len(ops))
+        elif op == _CLOSE:
+            start = loops.pop()
+            args[start] = len(ops)
+            arg = start
+        ops.append(op)
+        args.append(arg)
+        offsets.append(0)
+        positions.append(position)
+        index += 1
+    indexes[len(program)] = len(ops)
+    optimized.comments = [
+        (indexes[comment_index], start, end)
+        for comment_index, start, end in program.comments
+    ]
+    return optimized
+
+
+def optimize_stream(
+    items: Iterable[StreamItem],
+    max_loop: int = 1024,
+    int_size: Optional[IntegerSize] = None,
+) -> Iterator[StreamItem]:
+    """Optimize a stream of instructions from :func:`parse_stream` like :func:`optimize_program`.
+
+    Only the innermost loop that is currently being read is held in memory, until it can be replaced or it turns out it
+    can not be.
+
+    Parameters
+    ----------
+    items: Iterable[StreamItem]
+        The instructions and comments to optimize.
+    max_loop: int
+        The maximum amount of instructions in a loop that can be replaced. Longer loops are never held in memory, and
+        are kept as they are. Loops that contain comments are also kept as they are.
+    int_size: Optional[IntegerSize]
+        The amount of bits per integer of the cells the code will run with, see :func:`optimize_program`.
+
+    Yields
+    ------
+    StreamItem
+        The optimized instructions and the comments.
+    """
+    # The innermost loop that may be replaced, from its opening bracket
+    loop: Optional[List[Tuple[int, int, int]]] = None
+    # A set that the following additions are merged into
+    held: Optional[Tuple[int, int, int]] = None
+    ready: List[StreamItem] = []
+
+    def emit(item: StreamItem) -> None:
+        nonlocal held
+        if not isinstance(item, str):
+            op, arg, _ = item
+            if op in (_ADD, _MOVE) and arg == 0:
+                return
+            if op == _ADD and held is not None:
+                held = (_SET, held[1] + arg, 0)
+                return
+        if held is not None:
+            ready.append(held)
+            held = None
+        if not isinstance(item, str) and item[0] == _SET:
+            held = item
+        else:
+            ready.append(item)
+
+    for item in items:
+        if loop is not None:
+            if (
+                isinstance(item, str)
+                or item[0] in (_OPEN, _INPUT, _OUTPUT)
+                or len(loop) >= max_loop
+            ):
+                for pending in loop:
+                    emit(pending)
+                loop = None
+            elif item[0] == _CLOSE:
+                loop.append(item)
+                replacement = _optimize_loop(
+                    Program(
+                        ops=array("B", [op for op, _, _ in loop]),
+                        args=array("q", [arg for _, arg, _ in loop]),
+                    ),
+                    0,
+                    len(loop) - 1,
+                    int_size,
+                )
+                if replacement is None:
+                    for pending in loop:
+                        emit(pending)
+                else:
+                    for new_op, new_arg, new_offset in replacement:
+                        emit((new_op, new_arg, new_offset))
+                loop = None
+                yield from ready
+                ready.clear()
+                continue
+            else:
+                loop.append(item)
+                continue
+        if not isinstance(item, str) and item[0] == _OPEN:
+            loop = [item]
+        else:
+            emit(item)
+        yield from ready
+        ready.clear()
+    for pending in loop or ():
+        emit(pending)
+    if held is not None:
+        ready.append(held)
+    yield from ready
@@ -0,0 +1,162 @@
+from itertools import accumulate
+from typing import Any, Dict, List, NamedTuple
+
+from .enums import OpCode
+from .ir import Program
+
+__all__ = (
+    "LoopProfile",
+    "Profile",
+)
+
+_OPEN = OpCode.OPEN.value
+
+
+class LoopProfile(NamedTuple):
+    """How often a loop ran and how long it took, from :meth:`Profile.loops`."""
+
+    start: int
+    """The index of the ``[`` of the loop in the source."""
+    end: int
+    """The index after the ``]`` of the loop in the source."""
+    entries: int
+    """The amount of times the loop was reached, including the times it was skipped."""
+    iterations: int
+    """The amount of times the body of the loop ran."""
+    ops: int
+    """The amount of instructions that ran in the loop, including the instructions of nested loops."""
+    time: float
+    """The time spent in the loop, including nested loops, in seconds."""
+
+
+class Profile:
+    """The execution counts of a program, collected by :meth:`BrainfuckInterpreter.execute` while it runs.
+
+    Use ``profile=True`` with :meth:`BrainfuckTools.decode` to get one as :attr:`DecodedBrainfuck.profile`.
+
+    Parameters
+    ----------
+    program: Program
+        The program that is profiled. Its instructions are what is counted, so with an optimized program, a loop that
+        was replaced by a single instruction is counted as that instruction.
+
+    Attributes
+    ----------
+    program: Program
+        The program that is profiled.
+    counts: List[int]
+        The amount of times each instruction of :attr:`program` ran. For a :attr:`OpCode.CLOSE`, this is the
+        amount of iterations of its loop.
+    times: List[float]
+        The time spent in the loop starting at each :attr:`OpCode.OPEN` instruction of :attr:`program`, in seconds,
+        and ``0.0`` for every other instruction.
+    time: float
+        The time the program ran for, in seconds.
+    """
+
+    def __init__(self, program: Program) -> None:
+        self.program = program
+        self.counts = [0] * len(program)
+        self.times = [0.0] * len(program)
+        self.time = 0.0
+
+    @property
+    def total_ops(self) -> int:
+        """The amount of instructions that ran."""
+        return sum(self.counts)
+
+    @property
+    def ops_per_second(self) -> float:
+        """The amount of instructions that ran per second."""
+        return self.total_ops / self.time if self.time else 0.0
+
+    def loops(self) -> List[LoopProfile]:
+        """Get the profile of every loop, in the order they appear in the program.
+
+        Returns
+        -------
+        List[LoopProfile]
+            The loops.
+        """
+        program = self.program
+        totals = [0, *accumulate(self.counts)]
+        loops = []
+        for index, op in enumerate(program.ops):
+            if op != _OPEN:
+                continue
+            end = program.args[index]
+            loops.append(
+                LoopProfile(
+                    start=program.positions[index],
+                    end=program.positions[end] + 1,
+                    entries=self.counts[index],
+                    iterations=self.counts[end],
+                    ops=totals[end + 1] - totals[index],
+                    time=self.times[index],
+                )
+            )
+        return loops
+
+    def top_loops(self, count: int = 10) -> List[LoopProfile]:
+        """Get the profile of the loops that ran the most iterations.
+
+        Parameters
+        ----------
+        count: int
+            The maximum amount of loops to get.
+
+        Returns
+        -------
+        List[LoopProfile]
+            The loops, sorted by their iterations from most to least. Loops that never ran are left out.
+        """
+        loops = [loop for loop in self.loops() if loop.iterations]
+        loops.sort(key=lambda loop: loop.iterations, reverse=True)
+        return loops[:count]
+
+    def to_dict(self, top: int = 10) -> Dict[str, Any]:
+        """Export the profile, for example to store it as JSON.
+
+        Parameters
+        ----------
+        top: int
+            The amount of loops to include, see :meth:`top_loops`.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The total amount of instructions that ran as ``"total_ops"``, the time as ``"time"``, the instructions per
+            second as ``"ops_per_second"`` and the top loops as ``"loops"``, which is a list of dictionaries with the
+            fields of :class:`LoopProfile`.
+        """
+        return {
+            "total_ops": self.total_ops,
+            "time": self.time,
+            "ops_per_second": self.ops_per_second,
+            "loops": [loop._asdict() for loop in self.top_loops(top)],
+        }
+
+    def report(self, top: int = 10) -> str:
+        """Format the profile as a table that can be read by humans.
+
+        Parameters
+        ----------
+        top: int
+            The amount of loops to include, see :meth:`top_loops`.
+
+        Returns
+        -------
+        str
+            The report.
+        """
+        lines = [
+            f"{self.total_ops} instructions in {self.time:.6f} seconds "
+            f"({self.ops_per_second:.0f} per second)",
+            f"{'Source':>20} {'Entries':>12} {'Iterations':>12} {'Instructions':>14} {'Time':>10}",
+        ]
+        for loop in self.top_loops(top):
+            lines.append(
+                f"{f'{loop.start}-{loop.end}':>20} {loop.entries:>12} {loop.iterations:>12} {loop.ops:>14} "
+                f"{loop.time:>10.6f}"
+            )
+        return "\n".join(lines)
@@ -1,23 +1,22 @@
 # pylint: disable=invalid-name,global-statement
 import sys
+from array import array
 
 ARRAY_SIZE = int("{0}")
 INT_SIZE = int("{1}")
-data = bytearray(ARRAY_SIZE)
+MASK = 2**INT_SIZE - 1
+# The unsigned type code with cells of exactly INT_SIZE bits on this platform
+TYPECODE = next(code for code in "BHILQ" if array(code).itemsize * 8 == INT_SIZE)
+data = array(TYPECODE, bytes(ARRAY_SIZE * (INT_SIZE // 8)))
 POSITION = 0
 
 
 def _get_value() -> int:
-    value = data[POSITION]
-    for i in range(1, INT_SIZE // 8):
-        value += data[POSITION + i] << (i * 8)
-    return value
+    return data[POSITION]
 
 
 def _set_value(v: int) -> None:
-    data[POSITION] = v & 0xFF
-    for i in range(1, INT_SIZE // 8):
-        data[POSITION + i] = (v >> (i * 8)) & 0xFF
+    data[POSITION] = v & MASK
 
 
 def shift_right(a: int) -> None:
@@ -33,7 +32,7 @@ def shift_left(a: int) -> None:
 
 def increment(a: int) -> None:
     """Increment the value at the current position by the given amount."""
-    _set_value((_get_value() + a) % (2**INT_SIZE))
+    data[POSITION] = (data[POSITION] + a) & MASK
 
 
 def decrement(a: int) -> None:
@@ -41,16 +40,43 @@ def decrement(a: int) -> None:
     increment(-a)
 
 
+def set_value(a: int) -> None:
+    """Set the value at the current position to the given value."""
+    data[POSITION] = a & MASK
+
+
+def scan(a: int) -> None:
+    """Shift the pointer right by the given amount until the value at the current position is zero."""
+    while not is_zero():
+        shift_right(a)
+
+
+def multiply(a: int, b: int) -> None:
+    """Add the value at the current position, multiplied by b, to the value at the given offset."""
+    global POSITION
+    value = _get_value()
+    origin = POSITION
+    shift_right(a)
+    increment(value * b)
+    POSITION = origin
+
+
 def is_zero() -> bool:
     """Check if the value at the current position is zero."""
-    return data[POSITION] == 0
+    return not data[POSITION]
+
+
+def read_input(value: int) -> int:
+    """Read a value from the user, or return the given value if there is no more input."""
+    character = sys.stdin.read(1)
+    return ord(character) if character else value
 
 
 def get_input() -> None:
     """Get input from the user."""
-    data[POSITION] = ord(sys.stdin.read(1))
+    _set_value(read_input(_get_value()))
 
 
 def output() -> None:
     """Output the value at the current position."""
-    print(chr(_get_value()), end="")
+    print(chr(data[POSITION]), end="")
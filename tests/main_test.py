@@ -1,7 +1,10 @@
+import asyncio
 import io
+import os
 import random
 import string
 import sys
+import time
 from typing import IO, Optional
 
 import pytest
@@ -121,3 +124,614 @@ def test_hassizes():
     compiler = bftools.BrainfuckTools()
     assert compiler.array_size == 30000
     assert compiler.int_size == 8
+
+
+@pytest.fixture(params=["compiler", "interpreter"])
+def engine(request):
+    return request.param
+
+
+def test_engines(array_size, int_size, engine, code):
+    comp = bftools.BrainfuckTools(
+        array_size=array_size, int_size=int_size, engine=engine
+    )
+    assert comp.engine == engine
+    assert str(comp.decode(str(comp.encode(code)))) == code
+    assert str(bftools.decode_bf(str(comp.encode(code)), engine=engine)) == code
+
+
+@pytest.mark.parametrize("int_size", [8, 16, 32, 64])
+def test_engines_agree(int_size):
+    comp = bftools.BrainfuckTools(int_size=int_size)
+    # Values that don't fit in a byte, next to each other, so overlapping or truncated cells would show up
+    code = "+" * 300 + ">" + "+" * 65 + "<." + ">." + "-" * 60 + ".>+[-<+>]<."
+    assert str(comp.decode(code, engine="compiler")) == str(
+        comp.decode(code, engine="interpreter")
+    )
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        bftools.BrainfuckTools(engine="bogus")
+    with pytest.raises(ValueError):
+        bftools.decode_bf("+" * 65 + ".", engine="bogus")
+
+
+@pytest.mark.parametrize("code", ["[", "]", "[[]", "[]]", "+[>+<-]]["])
+def test_unbalanced_brackets(code):
+    with pytest.raises(bftools.UnbalancedBracketsException):
+        bftools.decode_bf(code, engine="interpreter")
+
+
+def test_parse_program():
+    program = bftools.parse_program("++-a[>>< .]b,")
+    assert list(program) == [
+        (bftools.OpCode.ADD, 1),
+        (bftools.OpCode.OPEN, 4),
+        (bftools.OpCode.MOVE, 1),
+        (bftools.OpCode.OUTPUT, 0),
+        (bftools.OpCode.CLOSE, 1),
+        (bftools.OpCode.INPUT, 0),
+    ]
+    assert list(program.positions) == [0, 4, 5, 9, 10, 12]
+    assert program.comments == [(1, 3, 4), (3, 8, 9), (5, 11, 12)]
+    assert [program.comment(i) for i in range(3)] == ["a", " ", "b"]
+
+
+HELLO_WORLD = "++++++++[>++++[>++>+++>+++>+<<<<-]>+>+>->>+[<]<-]>>.>---.+++++++..+++.>>.<-.<.+++.------.--------.>>+.>++."
+
+
+def test_optimize_program():
+    program = bftools.optimize_program(
+        bftools.parse_program("+-[-]++>-[+>+>--<<]<[>>]")
+    )
+    assert list(program) == [
+        (bftools.OpCode.SET, 2),
+        (bftools.OpCode.MOVE, 1),
+        (bftools.OpCode.ADD, -1),
+        (bftools.OpCode.MULTIPLY, -1),
+        (bftools.OpCode.MULTIPLY, 2),
+        (bftools.OpCode.SET, 0),
+        (bftools.OpCode.MOVE, -1),
+        (bftools.OpCode.SCAN, 2),
+    ]
+    assert list(program.offsets) == [0, 0, 0, 1, 2, 0, 0, 0]
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        HELLO_WORLD,
+        "+++++[->+++++++++++++<]>[>+>++<<-]>.>.[-]>[<]<.",
+        "+" * 256 + "[-]" + "+" * 65 + ".",
+        "+" * 300 + "[->+<]>" + "-" * 235 + ".",
+    ],
+)
+@pytest.mark.parametrize("int_size", [8, 16, 32, 64])
+def test_optimize_equivalence(engine, int_size, code):
+    comp = bftools.BrainfuckTools(int_size=int_size, engine=engine)
+    expected = str(comp.decode(code, engine="interpreter", optimize=False))
+    assert str(comp.decode(code)) == expected
+    assert str(comp.decode(code, optimize=False)) == expected
+
+
+@pytest.mark.parametrize("int_size", [8, 16, 32, 64])
+def test_optimize_odd_counter(engine, int_size):
+    code = "+" * 200 + "[--->++<]>"
+    program = bftools.optimize_program(bftools.parse_program(code), int_size)
+    assert bftools.OpCode.OPEN not in program.ops
+    # The values are too large to decode into text, so the engines are run directly
+    output = bftools.OutputBuffer(int_size)
+    if engine == "interpreter":
+        steps = bftools.BrainfuckInterpreter(int_size=int_size).execute(
+            code + ".", output
+        )
+    else:
+        compiled = bftools.BrainfuckTools(int_size=int_size).compile(
+            code + ".", fast=True
+        )
+        steps = bftools.DecodedBrainfuck.execute(compiled.body, output)
+    for _ in steps:
+        pass
+    # The loop runs n times, where 200 - 3 * n = 0, and adds 2 * n to the next cell
+    assert (3 * output.buffer[0] - 400) % 2**int_size == 0
+    # Even counters are kept, since they may loop forever
+    program = bftools.optimize_program(bftools.parse_program("[-->+<]"), int_size)
+    assert bftools.OpCode.OPEN in program.ops
+    program = bftools.optimize_program(bftools.parse_program(code))
+    assert bftools.OpCode.OPEN in program.ops
+
+
+def test_optimize_overflowing_counter(engine):
+    # The counter goes up, so the loop runs until it overflows
+    assert str(bftools.decode_bf("+[+>+<]>.", engine=engine)) == chr(255)
+
+
+def _time_compile(code):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        bftools.compile_bf(code, minify=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_compile_scales_linearly():
+    chunk = "+++ add three\n>-- take two [->+<] move it\n<."
+    small = _time_compile(chunk * 500)
+    large = _time_compile(chunk * 4000)
+    # 8 times the code should take about 8 times as long. Quadratic compilation would take about 64 times as long.
+    assert large / small < 24
+
+
+def test_compiled_body(int_size):
+    compiled = bftools.BrainfuckTools(int_size=int_size).compile(
+        HELLO_WORLD, minify=False
+    )
+    assert compiled.result.endswith(compiled.body)
+    decoder = bftools.DecodedBrainfuck()
+    decoder.parse(compiled.body, namespace=compiled.create_namespace())
+    assert str(decoder) == "Hello World!\n"
+    # Each namespace has its own tape
+    assert (
+        compiled.create_namespace()["data"] is not compiled.create_namespace()["data"]
+    )
+
+
+def test_compile_cache(engine):
+    comp = bftools.BrainfuckTools(engine=engine, cache_size=2)
+    assert comp.cache_info().entries == 0
+    first = comp.compile(HELLO_WORLD)
+    cached = comp.compile(HELLO_WORLD)
+    assert cached.result == first.result
+    assert cached.raw_parsed == first.raw_parsed != ()
+    info = comp.cache_info()
+    assert (info.hits, info.misses, info.entries) == (1, 1, 1)
+    assert info.size == len(first.result) + len(first.body)
+    for _ in range(2):
+        assert str(comp.decode(HELLO_WORLD)) == "Hello World!\n"
+    comp.compile("+.")
+    comp.compile("++.")
+    assert comp.cache_info().entries == 2
+    comp.clear_cache()
+    assert comp.cache_info() == bftools.CacheInfo(0, 0, 0, 2, 0, None)
+
+
+def test_compile_cache_max_size():
+    comp = bftools.BrainfuckTools(cache_size=10, cache_max_size=1)
+    comp.compile(HELLO_WORLD)
+    assert comp.cache_info().entries == 0
+    # The size is in bytes, so comments outside of ASCII count for more than their length
+    code = "+.ééé"
+    comp = bftools.BrainfuckTools(cache_size=10)
+    comp.compile(code)
+    compiled = comp.last_compiled
+    size = len((compiled.result + compiled.body).encode())
+    assert comp.cache_info().size == size > len(compiled.result + compiled.body)
+    comp = bftools.BrainfuckTools()
+    comp.compile(HELLO_WORLD)
+    comp.compile(HELLO_WORLD)
+    assert comp.cache_info() == bftools.CacheInfo(0, 0, 0, 0, 0, None)
+
+
+def test_disk_cache(tmp_path):
+    comp = bftools.BrainfuckTools(cache_dir=tmp_path)
+    compiled = comp.compile(HELLO_WORLD)
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1 and files[0].suffix == ".bfc"
+    # A new instance, like one in a restarted process, loads the stored program
+    comp = bftools.BrainfuckTools(cache_dir=tmp_path)
+    assert comp.compile(HELLO_WORLD).result == compiled.result
+    assert comp.compile(HELLO_WORLD).program is None
+    assert str(comp.decode(HELLO_WORLD)) == "Hello World!\n"
+    # Corrupt files are ignored and replaced
+    for file in tmp_path.iterdir():
+        file.write_bytes(b"corrupt")
+    assert str(comp.decode(HELLO_WORLD)) == "Hello World!\n"
+    assert str(bftools.BrainfuckTools(cache_dir=tmp_path).decode(HELLO_WORLD)) == (
+        "Hello World!\n"
+    )
+    comp.clear_cache()
+    assert not list(tmp_path.iterdir())
+
+
+def test_disk_cache_prune(tmp_path):
+    cache = bftools.DiskCache(tmp_path)
+    comp = bftools.BrainfuckTools(cache_dir=tmp_path)
+    for i in range(5):
+        comp.compile("+" * i + ".")
+    assert len(list(tmp_path.iterdir())) == 5
+    cache.prune(cache.size() // 2)
+    assert 0 < len(list(tmp_path.iterdir())) < 5
+    assert not list(tmp_path.glob("*.tmp"))
+    # Temporary files are only removed once they are old enough to be left behind by an interrupted write
+    stale, fresh = tmp_path / "stale.tmp", tmp_path / "fresh.tmp"
+    stale.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    os.utime(stale, (0, 0))
+    cache.prune(0)
+    assert list(tmp_path.iterdir()) == [fresh]
+
+
+def test_disk_cache_prune_scans(monkeypatch, tmp_path):
+    scans = []
+    scandir = os.scandir
+    # Only the programs are counted, not the directory of the native engine's libraries
+    monkeypatch.setattr(
+        os,
+        "scandir",
+        lambda path: (path == str(tmp_path) and scans.append(path)) or scandir(path),
+    )
+    comp = bftools.BrainfuckTools(cache_dir=tmp_path, cache_dir_max_size=10**6)
+    for i in range(20):
+        comp.compile("+" * i + ".")
+    # The size is tracked in memory after the first scan
+    assert len(scans) == 1
+    comp = bftools.BrainfuckTools(cache_dir=tmp_path, cache_dir_max_size=1)
+    comp.compile(HELLO_WORLD)
+    assert len(scans) == 2 and not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("code", [HELLO_WORLD, "+++++[->++++++++++++<]>+++++.>+[<]>."])
+def test_fast_compile(int_size, code):
+    comp = bftools.BrainfuckTools(int_size=int_size)
+    compiled = comp.compile(code, minify=False, fast=True)
+    assert "shift_right" not in compiled.result
+    decoder = bftools.DecodedBrainfuck()
+    decoder.parse(compiled.result)
+    assert str(decoder) == str(comp.decode(code, engine="interpreter"))
+
+
+def test_template_cells(int_size):
+    compiled = bftools.BrainfuckTools(int_size=int_size).compile(
+        "->--<[->+<]", minify=False
+    )
+    namespace = compiled.create_namespace()
+    bftools.DecodedBrainfuck().parse(compiled.body, namespace=namespace)
+    assert namespace["data"].itemsize * 8 == int_size
+    # -1 + -2 wraps around to 2 ** int_size - 3 in a single cell
+    assert list(namespace["data"][:3]) == [0, 2**int_size - 3, 0]
+
+
+def test_output_buffer(engine):
+    buffer = bytearray(b"prefix:")
+    output = bftools.OutputBuffer(buffer=buffer)
+    decoded = bftools.decode_bf(HELLO_WORLD, engine=engine, output=output)
+    assert str(decoded) == "prefix:Hello World!\n"
+    assert decoded.output is output
+    assert buffer == b"prefix:Hello World!\n"
+    # The two bytes of "é" in utf-8, which are two characters without an encoding
+    code = "+" * 0xC3 + ".>" + "+" * 0xA9 + "."
+    assert str(bftools.decode_bf(code, engine=engine)) == "\xc3\xa9"
+    output = bftools.OutputBuffer(encoding="utf-8")
+    assert str(bftools.decode_bf(code, engine=engine, output=output)) == "é"
+    assert output.getvalue() == b"\xc3\xa9"
+
+
+def test_output_buffer_int_size(engine, int_size):
+    comp = bftools.BrainfuckTools(int_size=int_size, engine=engine)
+    decoded = comp.decode("+" * 300 + ".")
+    assert list(decoded.output.buffer) == [300 % 2**int_size]
+    assert str(decoded) == chr(300 % 2**int_size)
+
+
+def test_decode_stream(engine, int_size):
+    comp = bftools.BrainfuckTools(int_size=int_size, engine=engine)
+    # Prints "A" forever, but the stream must start yielding right away
+    chunks = comp.decode_stream("+" * 65 + "[.]", chunk_size=4)
+    assert [next(chunks) for _ in range(3)] == ["AAAA"] * 3
+    chunks.close()
+    chunks = list(comp.decode_stream(HELLO_WORLD, chunk_size=5))
+    assert "".join(chunks) == "Hello World!\n"
+    assert all(len(chunk) == 5 for chunk in chunks[:-1])
+    assert not list(comp.decode_stream("+-"))
+    with pytest.raises(ValueError):
+        next(comp.decode_stream(HELLO_WORLD, chunk_size=0))
+
+
+def test_decode_stream_encoding(engine):
+    # A chunk boundary in the middle of "é" must not split the character
+    code = "+" * 0xC3 + ".>" + "+" * 0xA9 + "."
+    chunks = bftools.decode_bf_stream(
+        code, chunk_size=1, engine=engine, encoding="utf-8"
+    )
+    assert list(chunks) == ["é"]
+
+
+# Copies the input to the output until the input ends, at which point the cell stays the same
+CAT = ",[.,]"
+
+
+@pytest.mark.parametrize(
+    "stdin",
+    [
+        b"hello",
+        "hello",
+        [b"he", b"", "l", 108, b"o"],
+        lambda: io.BytesIO(b"hello"),
+        lambda: io.StringIO("hello"),
+    ],
+)
+def test_input(engine, stdin):
+    if callable(stdin):
+        stdin = stdin()
+    # With "leave", the last "o" is read again forever, so check the end of input with "zero" here
+    decoded = bftools.decode_bf(CAT, engine=engine, stdin=stdin, eof="zero")
+    assert str(decoded) == "hello"
+
+
+@pytest.mark.parametrize("eof, value", [("leave", 5), ("zero", 0), ("minus_one", 255)])
+def test_input_eof(engine, eof, value):
+    decoded = bftools.decode_bf("+++++,.", engine=engine, stdin=b"", eof=eof)
+    assert list(decoded.output.buffer) == [value]
+
+
+def test_input_buffer():
+    with pytest.raises(ValueError):
+        bftools.InputBuffer(b"", eof="unknown")
+    # A small chunk size still reads every value of a file
+    stdin = bftools.InputBuffer(io.BytesIO(b"abc"), chunk_size=2)
+    assert str(bftools.decode_bf(",.,.,.,.", stdin=stdin)) == "abcc"
+
+
+def _chunks(code, size):
+    return (code[i : i + size] for i in range(0, len(code), size))
+
+
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.parametrize("optimize", [False, True])
+def test_compile_stream(int_size, optimize, fast):
+    # The runs split by comments at the end are folded like compile folds them
+    code = "comment\n" + HELLO_WORLD + "[-]>+++[->++<]>[>]<[<] end-y#+-->-\n<a<"
+    comp = bftools.BrainfuckTools(int_size=int_size)
+    expected = comp.compile(code, minify=False, optimize=optimize, fast=fast).result
+    for size in (1, 7, len(code)):
+        destination = io.StringIO()
+        comp.compile_stream(
+            _chunks(code, size), destination, optimize=optimize, fast=fast
+        )
+        assert destination.getvalue() == expected
+    destination = io.StringIO()
+    comp.compile_stream(io.StringIO(code), destination, chunk_size=3, fast=fast)
+    decoder = bftools.DecodedBrainfuck()
+    decoder.parse(destination.getvalue())
+    assert str(decoder) == str(comp.decode(code, engine="interpreter"))
+
+
+def test_compile_stream_unbalanced():
+    with pytest.raises(bftools.UnbalancedBracketsException):
+        bftools.compile_bf_stream(["+[", "-]]"], io.StringIO())
+    with pytest.raises(bftools.UnbalancedBracketsException):
+        bftools.compile_bf_stream(["+[", "[-]"], io.StringIO())
+
+
+def test_compile_stream_binary():
+    with pytest.raises(TypeError):
+        bftools.compile_bf_stream(io.BytesIO(b"+."), io.StringIO())
+    with pytest.raises(TypeError):
+        bftools.compile_bf_stream(["+", b"."], io.StringIO())
+
+
+def test_tokenize():
+    symbols, comments = bftools.tokenize("+é>[-]x.")
+    assert [tuple(bftools.Symbol)[symbol] for symbol in symbols] == [
+        bftools.Symbol.ADD,
+        bftools.Symbol.UNKNOWN,
+        bftools.Symbol.SHIFTRIGHT,
+        bftools.Symbol.STARTLOOP,
+        bftools.Symbol.SUBTRACT,
+        bftools.Symbol.ENDLOOP,
+        bftools.Symbol.UNKNOWN,
+        bftools.Symbol.OUTPUT,
+    ]
+    assert comments == [(1, 2), (6, 7)]
+    compiled = bftools.compile_bf("+é-x.", minify=False)
+    assert compiled.raw_parsed == tuple(map(bftools.Symbol, "+é-x."))
+
+
+def test_encode_table(int_size):
+    comp = bftools.BrainfuckTools(int_size=int_size)
+    # Values above 127 used to be encoded with 8 bit overflow regardless of the integer size
+    text = "".join(map(chr, range(120, 2**int_size if int_size == 8 else 600, 3)))
+    encoded = str(comp.encode(text))
+    assert str(comp.decode(encoded)) == text
+    assert str(comp.encode(text)) == encoded
+    # Only the first 256 values are kept between texts
+    assert max(bftools.encoder._encoding_table(int_size)) < 256
+
+
+@pytest.mark.parametrize("strategy", ["delta", "bank"])
+def test_encode_strategy(int_size, code, strategy):
+    comp = bftools.BrainfuckTools(int_size=int_size)
+    text = "the quick brown fox jumps over the lazy dog" + code
+    encoded = str(comp.encode(text, strategy=strategy))
+    assert str(comp.decode(encoded)) == text
+    assert len(encoded) < len(str(comp.encode(text)))
+    assert str(comp.encode("", strategy=strategy)) == ""
+    with pytest.raises(ValueError):
+        comp.encode(text, strategy="unknown")
+
+
+def test_encode_bank():
+    # Long enough that the bank is chosen from a sample of the text
+    text = "Lorem ipsum dolor sit amet, 0123456789. " * 200
+    encoded = str(bftools.encode_text(text, strategy="bank"))
+    assert str(bftools.decode_bf(encoded)) == text
+    assert len(encoded) < len(str(bftools.encode_text(text, strategy="delta")))
+
+
+@pytest.mark.parametrize("strategy", ["absolute", "delta", "bank"])
+def test_encode_workers(strategy):
+    comp = bftools.BrainfuckTools(int_size=16)
+    text = "Some text. " * 30 + "zzzz\0" * 10 + "ÿ" + "Ā" * 3
+    encoded = str(comp.encode(text, strategy=strategy, workers=2, chunk_size=37))
+    assert str(comp.decode(encoded)) == text
+    if strategy == "absolute":
+        assert encoded == str(comp.encode(text))
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+@pytest.mark.parametrize("strategy", ["absolute", "delta", "bank"])
+def test_encode_longer_than_array(strategy, workers):
+    comp = bftools.BrainfuckTools(array_size=100)
+    text = "The tape wraps around. " * 20
+    encoded = str(comp.encode(text, strategy=strategy, workers=workers, chunk_size=90))
+    assert str(comp.decode(encoded)) == text
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_batches(ordered):
+    codes = ["+" * i + "." for i in range(65, 91)] + ["+[", HELLO_WORLD]
+    with bftools.BrainfuckTools(workers=2) as comp:
+        results = list(comp.decode_many(iter(codes), chunksize=3, ordered=ordered))
+        if ordered:
+            assert [result.position for result in results] == list(range(len(codes)))
+        results.sort()
+        assert [result.result for result in results[:26]] == list(
+            string.ascii_uppercase
+        )
+        assert isinstance(results[26].error, bftools.UnbalancedBracketsException)
+        assert results[26].result is None
+        assert results[27].result == "Hello World!\n"
+        compiled = list(comp.compile_many(codes[-1:], minify=False, ordered=ordered))
+        assert compiled[0].result == str(comp.compile(HELLO_WORLD, minify=False))
+    with pytest.raises(ValueError):
+        comp.decode_many(codes, chunksize=0)
+
+
+@pytest.mark.parametrize("engine", ["compiler", "interpreter"])
+def test_async(engine):
+    comp = bftools.BrainfuckTools(engine=engine)
+
+    async def run():
+        decoded = await comp.adecode(HELLO_WORLD, ticks=3)
+        assert comp.last_decoded is decoded
+        assert str(decoded) == str(comp.decode(HELLO_WORLD))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(comp.adecode("+[]", ticks=100), 0.1)
+        # Loops that are optimized into a scan give control back too
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(comp.adecode("+[[>]+]", ticks=100), 0.1)
+        compiled = await comp.acompile(HELLO_WORLD, minify=False, fast=True)
+        assert str(compiled) == str(comp.compile(HELLO_WORLD, minify=False, fast=True))
+        encoded = await comp.aencode("Hi!", strategy="delta")
+        assert str(encoded) == str(comp.encode("Hi!", strategy="delta"))
+
+    asyncio.run(run())
+    with pytest.raises(ValueError):
+        asyncio.run(comp.adecode(HELLO_WORLD, ticks=0))
+
+
+@pytest.mark.parametrize("engine", ["compiler", "interpreter"])
+def test_decode_limits(engine):
+    comp = bftools.BrainfuckTools(engine=engine)
+    # 5 loop iterations, which can not be optimized away because of the output
+    code = "+++++[-.]"
+    decoded = comp.decode(code, max_steps=5, max_output=5, deadline=10)
+    assert str(decoded) == "\x04\x03\x02\x01\x00"
+    with pytest.raises(bftools.BudgetExceededException) as info:
+        comp.decode(code, max_steps=3)
+    assert (info.value.limit, info.value.steps) == ("max_steps", 4)
+    with pytest.raises(bftools.BudgetExceededException) as info:
+        comp.decode("+[.]", max_output=3)
+    assert (info.value.limit, info.value.output) == ("max_output", "\x01" * 4)
+    start = time.perf_counter()
+    with pytest.raises(bftools.BudgetExceededException) as info:
+        bftools.decode_bf("+[>+<]", engine=engine, deadline=0.05)
+    assert info.value.limit == "deadline"
+    assert time.perf_counter() - start < 5
+    with pytest.raises(ValueError):
+        comp.decode(code, max_steps=-1)
+
+
+@pytest.mark.parametrize("engine", ["compiler", "interpreter", "native"])
+def test_decode_limits_scan(engine, tmp_path):
+    # The inner loop is optimized into a scan, which never finds a zero cell
+    comp = bftools.BrainfuckTools(array_size=10, engine=engine, cache_dir=tmp_path)
+    with pytest.raises(bftools.BudgetExceededException) as info:
+        comp.decode("+[[>]+]", deadline=0.2)
+    assert info.value.limit == "deadline"
+    with pytest.raises(bftools.BudgetExceededException) as info:
+        comp.decode("+[[>]+]", max_steps=1000)
+    assert (info.value.limit, info.value.steps) == ("max_steps", 1001)
+
+
+def test_profile():
+    decoded = bftools.decode_bf(HELLO_WORLD, optimize=False, profile=True)
+    assert str(decoded) == "Hello World!\n"
+    profile = decoded.profile
+    assert profile.total_ops == 583
+    assert profile.ops_per_second > 0
+    outer, middle, inner = sorted(profile.loops(), key=lambda loop: loop.start)[:3]
+    assert HELLO_WORLD[outer.start] == "[" and HELLO_WORLD[outer.end - 1] == "]"
+    assert (outer.entries, outer.iterations) == (1, 8)
+    assert (middle.entries, middle.iterations) == (8, 32)
+    assert outer.ops > middle.ops and outer.time >= middle.time
+    assert profile.top_loops(1)[0].iterations == 40
+    report = profile.to_dict(top=2)
+    assert report["total_ops"] == 583
+    assert [loop["iterations"] for loop in report["loops"]] == [40, 32]
+    assert "583 instructions" in profile.report()
+    # Optimized loops are counted as the instructions that replaced them
+    optimized = bftools.decode_bf(HELLO_WORLD, profile=True).profile
+    assert optimized.total_ops < profile.total_ops
+    with pytest.raises(bftools.BudgetExceededException):
+        bftools.decode_bf("+[]", profile=True, max_steps=10)
+    assert bftools.decode_bf(HELLO_WORLD).profile is None
+
+
+@pytest.mark.skipif(not bftools.NativeBrainfuck.available(), reason="no C compiler")
+def test_native(int_size, tmp_path):
+    comp = bftools.BrainfuckTools(
+        int_size=int_size, engine="native", cache_dir=tmp_path
+    )
+    assert str(comp.decode(HELLO_WORLD)) == "Hello World!\n"
+    assert str(comp.decode(",[.,]", stdin="cat", eof="zero")) == "cat"
+    chunks = list(comp.decode_stream("+" * 50 + "[-.]", chunk_size=20))
+    assert [len(chunk) for chunk in chunks] == [20, 20, 10]
+    with pytest.raises(bftools.BudgetExceededException) as info:
+        comp.decode("+++++[-.]", max_steps=3)
+    assert (info.value.limit, info.value.steps) == ("max_steps", 4)
+    with pytest.raises(bftools.BudgetExceededException) as info:
+        comp.decode("+[>+<]", deadline=0.05)
+    assert info.value.limit == "deadline"
+    # The libraries are stored by the hash of their source, so running the same code again reuses them
+    libraries = sorted(os.listdir(tmp_path / "native"))
+    comp.decode(HELLO_WORLD)
+    assert sorted(os.listdir(tmp_path / "native")) == libraries
+    # They are part of the disk cache
+    assert bftools.DiskCache(tmp_path).size() >= sum(
+        (tmp_path / "native" / name).stat().st_size for name in libraries
+    )
+    comp.clear_cache()
+    assert not os.listdir(tmp_path / "native")
+    small = bftools.BrainfuckTools(
+        int_size=int_size, engine="native", cache_dir=tmp_path, cache_dir_max_size=1
+    )
+    assert str(small.decode(HELLO_WORLD + "+")) == "Hello World!\n"
+    assert not os.listdir(tmp_path / "native")
+    native = bftools.NativeBrainfuck(int_size=int_size, directory=tmp_path)
+    assert "bf_run" in native.translate(HELLO_WORLD)
+    output = bftools.OutputBuffer(int_size)
+    for _ in native.execute("+" * 200 + "[--->++<]>.", output):
+        pass
+    assert (3 * output.buffer[0] - 400) % 2**int_size == 0
+
+
+def test_native_fallback(monkeypatch, tmp_path):
+    monkeypatch.setenv("CC", str(tmp_path / "missing-cc"))
+    assert not bftools.NativeBrainfuck.available()
+    comp = bftools.BrainfuckTools(engine="native")
+    with pytest.warns(RuntimeWarning) as warnings:
+        for _ in range(3):
+            assert str(comp.decode(HELLO_WORLD)) == "Hello World!\n"
+    # The compiler is only looked for once
+    assert len(warnings) == 1
+    native = bftools.NativeBrainfuck(directory=tmp_path)
+    with pytest.raises(bftools.NativeCompilerException):
+        native.run(HELLO_WORLD)
+    if sys.platform != "win32":
+        # A compiler that always fails
+        monkeypatch.setenv("CC", "false")
+        with pytest.raises(bftools.NativeCompilerException):
+            native.run(HELLO_WORLD)